@@ -0,0 +1,250 @@
+import math
+
+from logic import *
+
+# Identifiers of the terminal nodes
+ZERO = 0
+ONE = 1
+
+
+class BDD:
+    """
+    Manager of reduced ordered binary decision diagrams.
+    Nodes are identified by integers and shared through a unique table,
+    so equivalent sentences compile to the very same node.
+    """
+
+    def __init__(self, order=()):
+
+        # Variable order, and the level of each variable in that order
+        self.order = []
+        self.level = dict()
+
+        # Each node is a (level, low, high) triple; terminals sit below every level
+        self.nodes = [(math.inf, None, None), (math.inf, None, None)]
+
+        # Unique table maps (level, low, high) to an existing node
+        self.unique = dict()
+
+        # Operation cache maps (operation, operands) to a resulting node
+        self.cache = dict()
+
+        for name in order:
+            self.add_variable(name)
+
+    def add_variable(self, name):
+        """
+        Appends a variable at the bottom of the order, if not already present.
+        """
+        if name not in self.level:
+            self.level[name] = len(self.order)
+            self.order.append(name)
+        return self.level[name]
+
+    def node(self, level, low, high):
+        """
+        Returns the node testing the variable at `level`,
+        creating it only if no equivalent node exists yet.
+        """
+        # Redundant test
+        if low == high:
+            return low
+
+        key = (level, low, high)
+        if key not in self.unique:
+            self.unique[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self.unique[key]
+
+    def variable(self, name):
+        """Returns the node representing a single variable."""
+        return self.node(self.add_variable(name), ZERO, ONE)
+
+    def negate(self, u):
+        """Returns the node representing the negation of `u`."""
+        if u <= ONE:
+            return ONE - u
+
+        key = ("not", u)
+        if key not in self.cache:
+            level, low, high = self.nodes[u]
+            self.cache[key] = self.node(level, self.negate(low), self.negate(high))
+        return self.cache[key]
+
+    def apply(self, operator, u, v):
+        """
+        Returns the node combining `u` and `v` with a binary boolean operator,
+        one of "and", "or", "implies" and "iff".
+        """
+        if u <= ONE and v <= ONE:
+            return int(OPERATORS[operator](bool(u), bool(v)))
+
+        # Shortcuts that don't need to visit the other operand
+        if operator == "and" and ZERO in (u, v):
+            return ZERO
+        if operator == "or" and ONE in (u, v):
+            return ONE
+        if operator in ("and", "or") and u == v:
+            return u
+
+        key = (operator, u, v)
+        if key not in self.cache:
+            u_level, u_low, u_high = self.nodes[u]
+            v_level, v_low, v_high = self.nodes[v]
+            level = min(u_level, v_level)
+
+            # Only split the operands whose top variable is the one being tested
+            if u_level != level:
+                u_low = u_high = u
+            if v_level != level:
+                v_low = v_high = v
+
+            self.cache[key] = self.node(
+                level,
+                self.apply(operator, u_low, v_low),
+                self.apply(operator, u_high, v_high),
+            )
+        return self.cache[key]
+
+    def restrict(self, u, name, value):
+        """
+        Returns the node representing `u` with a variable fixed to a value.
+        """
+        if name not in self.level:
+            return u
+        level = self.level[name]
+        memo = dict()
+
+        def restrict_below(u):
+            """Restricts the sub-diagram rooted at `u`."""
+            u_level, low, high = self.nodes[u]
+            if u_level > level:
+                return u
+            if u_level == level:
+                return high if value else low
+            if u not in memo:
+                memo[u] = self.node(u_level, restrict_below(low), restrict_below(high))
+            return memo[u]
+
+        return restrict_below(u)
+
+    def compile(self, sentence):
+        """Returns the node representing a logical sentence."""
+        if isinstance(sentence, Constant):
+            return int(sentence.value)
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return self.negate(self.compile(sentence.operand))
+        if isinstance(sentence, And):
+            return self.reduce("and", sentence.conjuncts, ONE)
+        if isinstance(sentence, Or):
+            return self.reduce("or", sentence.disjuncts, ZERO)
+        if isinstance(sentence, Implication):
+            return self.apply(
+                "implies",
+                self.compile(sentence.antecedent),
+                self.compile(sentence.consequent),
+            )
+        if isinstance(sentence, Biconditional):
+            return self.apply(
+                "iff", self.compile(sentence.left), self.compile(sentence.right)
+            )
+        raise TypeError("must be a logical sentence")
+
+    def reduce(self, operator, operands, initial):
+        """Combines the compiled operands of a conjunction or disjunction."""
+        u = initial
+        for operand in operands:
+            u = self.apply(operator, u, self.compile(operand))
+        return u
+
+    def count(self, u):
+        """
+        Returns the number of models of `u` over all variables of the manager.
+        """
+        memo = dict()
+
+        def count_below(u):
+            """Counts models over the variables from the level of `u` down."""
+            if u <= ONE:
+                return u
+            if u not in memo:
+                level, low, high = self.nodes[u]
+                memo[u] = (
+                    count_below(low) * 2 ** (self.depth(low) - level - 1)
+                    + count_below(high) * 2 ** (self.depth(high) - level - 1)
+                )
+            return memo[u]
+
+        return count_below(u) * 2 ** self.depth(u)
+
+    def depth(self, u):
+        """Returns the level of `u`, counting terminals as the last level."""
+        level = self.nodes[u][0]
+        return len(self.order) if level == math.inf else level
+
+    def size(self, u):
+        """Returns the number of nodes reachable from `u`, terminals included."""
+        seen = set()
+        stack = [u]
+        while stack:
+            u = stack.pop()
+            if u in seen:
+                continue
+            seen.add(u)
+            if u > ONE:
+                stack.extend(self.nodes[u][1:])
+        return len(seen)
+
+
+OPERATORS = {
+    "and": lambda a, b: a and b,
+    "or": lambda a, b: a or b,
+    "implies": lambda a, b: (not a) or b,
+    "iff": lambda a, b: a == b,
+}
+
+
+class CompiledKnowledge:
+    """
+    Knowledge base compiled once into a BDD, so that repeated
+    satisfiability, model counting and entailment queries are cheap.
+    """
+
+    def __init__(self, knowledge, order=None):
+        if order is None:
+            order = sorted(knowledge.symbols())
+        self.bdd = BDD(order)
+        self.root = self.bdd.compile(knowledge)
+        self.symbols = set(order) | knowledge.symbols()
+
+    def satisfiable(self):
+        """Checks if the knowledge base has at least one model."""
+        return self.root != ZERO
+
+    def count(self):
+        """Returns the number of models of the knowledge base."""
+        return self.bdd.count(self.root) // 2 ** (
+            len(self.bdd.order) - len(self.symbols)
+        )
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+
+        # A literal only needs the knowledge base restricted to its negation
+        unit = literal(query)
+        if unit is not None:
+            name, value = unit
+            if name not in self.symbols:
+                return not self.satisfiable()
+            return self.bdd.restrict(self.root, name, not value) == ZERO
+
+        # Otherwise, knowledge and the negated query must be unsatisfiable
+        negated = self.bdd.negate(self.bdd.compile(query))
+        return self.bdd.apply("and", self.root, negated) == ZERO
+
+
+def bdd_check(knowledge, query):
+    """Checks if knowledge base entails query by compiling it to a BDD."""
+    return CompiledKnowledge(knowledge).entails(query)
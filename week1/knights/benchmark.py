@@ -0,0 +1,170 @@
+import random
+import sys
+import time
+
+from bdd import CompiledKnowledge
+from logic import *
+from solver import KnowledgeBase
+
+# Number of statements generated per inhabitant
+STATEMENTS = 2
+
+# Seconds after which a backend is no longer considered practical
+TIME_LIMIT = 5
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) not in [1, 2, 3]:
+        sys.exit("Usage: python benchmark.py [max_inhabitants] [time_limit]")
+    max_inhabitants = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else TIME_LIMIT
+
+    results = benchmark(range(1, max_inhabitants + 1), time_limit)
+
+    # Print results
+    for backend, timings in results.items():
+        print(f"{backend}:")
+        for n, seconds in timings.items():
+            print(
+                f"  {n} inhabitants: {seconds['compile']:.4f}s compile, "
+                f"{seconds['query']:.4f}s query"
+            )
+        if timings and sum(timings[max(timings)].values()) > time_limit:
+            print(f"  Impractical from {max(timings)} inhabitants.")
+
+
+def generate_puzzle(inhabitants, statements, seed=None):
+    """
+    Generate a random knights and knaves puzzle.
+
+    Return a tuple `(knowledge, knights)`, where `knowledge` is the knowledge
+    base of the puzzle and `knights` is the list of symbols stating that each
+    inhabitant is a knight. Statements are chosen to be consistent with a
+    hidden assignment, so the knowledge base is always satisfiable.
+    """
+    rng = random.Random(seed)
+    knights = [Symbol(f"{i} is a Knight") for i in range(inhabitants)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(inhabitants)]
+    world = {knight.name: rng.random() < 0.5 for knight in knights}
+    for knight, knave in zip(knights, knaves):
+        world[knave.name] = not world[knight.name]
+
+    # Everyone must be a knight xor a knave
+    knowledge = And(*[Not(Biconditional(a, b)) for a, b in zip(knights, knaves)])
+
+    for _ in range(statements):
+        speaker = rng.randrange(inhabitants)
+        claim = random_claim(rng, knights, knaves)
+
+        # Knights tell the truth and knaves lie
+        if claim.evaluate(world) != world[knights[speaker].name]:
+            claim = Not(claim)
+        knowledge.add(Biconditional(knights[speaker], claim))
+
+    return knowledge, knights
+
+
+def random_claim(rng, knights, knaves):
+    """
+    Return a random claim about one or two inhabitants.
+    """
+    a, b = rng.randrange(len(knights)), rng.randrange(len(knights))
+    kind_a = rng.choice([knights, knaves])[a]
+    kind_b = rng.choice([knights, knaves])[b]
+    return rng.choice([
+        lambda: kind_a,
+        lambda: And(kind_a, kind_b),
+        lambda: Or(kind_a, kind_b),
+        lambda: Implication(kind_a, kind_b),
+        lambda: Biconditional(knights[a], knights[b]),
+    ])()
+
+
+def enumeration_check(knowledge, query):
+    """Checks if knowledge base entails query by enumerating its models."""
+    symbols = set.union(knowledge.symbols(), query.symbols())
+    return all(query.evaluate(model) for model in enumerate_models(knowledge, symbols))
+
+
+def model_check_backend(knowledge):
+    """Returns a query function answering with `model_check`."""
+    return lambda query: model_check(knowledge, query)
+
+
+def simplified_backend(knowledge):
+    """Simplifies the knowledge base once, then answers with `model_check`."""
+    simplified = simplify(knowledge)
+    return lambda query: model_check(simplified, query)
+
+
+def enumeration_backend(knowledge):
+    """Returns a query function answering by lazy model enumeration."""
+    return lambda query: enumeration_check(knowledge, query)
+
+
+def bdd_backend(knowledge):
+    """Compiles the knowledge base to a BDD once for every query."""
+    return CompiledKnowledge(knowledge).entails
+
+
+def incremental_backend(knowledge):
+    """Loads the knowledge base into a clause-learning solver once."""
+    return KnowledgeBase(*knowledge.conjuncts).ask
+
+
+# Each backend prepares a knowledge base and returns a function answering queries
+BACKENDS = {
+    "model_check": model_check_backend,
+    "simplified": simplified_backend,
+    "enumeration": enumeration_backend,
+    "bdd": bdd_backend,
+    "incremental": incremental_backend,
+}
+
+
+def benchmark(sizes, time_limit=TIME_LIMIT, backends=BACKENDS):
+    """
+    Time every backend answering whether each inhabitant is a knight,
+    for puzzles with each number of inhabitants in `sizes`.
+
+    Each backend prepares the knowledge base once per puzzle, then answers
+    every query against it. Return a dictionary mapping each backend name
+    to a dictionary mapping each number of inhabitants to a dictionary of
+    seconds spent on "compile" and on "query". A backend stops being run
+    once a puzzle takes longer than `time_limit` seconds in total.
+    """
+    results = {backend: dict() for backend in backends}
+    stopped = set()
+    for n in sizes:
+        knowledge, knights = generate_puzzle(n, STATEMENTS * n, seed=n)
+        answers = dict()
+        for backend, prepare in backends.items():
+
+            # Skip backends that already stopped being practical
+            if backend in stopped:
+                continue
+
+            start = time.perf_counter()
+            ask = prepare(knowledge)
+            compiled = time.perf_counter()
+            answers[backend] = [ask(knight) for knight in knights]
+            end = time.perf_counter()
+
+            results[backend][n] = {
+                "compile": compiled - start,
+                "query": end - compiled,
+            }
+            if end - start > time_limit:
+                stopped.add(backend)
+
+        # Every backend must agree on the answers
+        if len(set(map(tuple, answers.values()))) > 1:
+            raise Exception(f"backends disagree on puzzle with {n} inhabitants")
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
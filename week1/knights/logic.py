@@ -15,6 +15,17 @@ class Sentence:
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def simplify(self, model=None):
+        """
+        Returns an equivalent simplified sentence, replacing any symbol
+        assigned in `model` by its constant value.
+        """
+        return self
+
+    def size(self):
+        """Returns the number of nodes in the logical sentence."""
+        return 1
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -46,6 +57,31 @@ class Sentence:
             return f"({s})"
 
 
+class Constant(Sentence):
+
+    def __init__(self, value):
+        self.value = bool(value)
+
+    def __eq__(self, other):
+        return isinstance(other, Constant) and self.value == other.value
+
+    def __hash__(self):
+        return hash(("constant", self.value))
+
+    def __repr__(self):
+        return f"Constant({self.value})"
+
+    def evaluate(self, model):
+        return self.value
+
+    def formula(self):
+        return "⊤" if self.value else "⊥"
+
+
+TRUE = Constant(True)
+FALSE = Constant(False)
+
+
 class Symbol(Sentence):
 
     def __init__(self, name):
@@ -72,6 +108,11 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def simplify(self, model=None):
+        if model and self.name in model:
+            return Constant(model[self.name])
+        return self
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -96,6 +137,18 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def simplify(self, model=None):
+        operand = self.operand.simplify(model)
+        if isinstance(operand, Constant):
+            return Constant(not operand.value)
+        # Remove double negation
+        if isinstance(operand, Not):
+            return operand.operand
+        return Not(operand)
+
+    def size(self):
+        return 1 + self.operand.size()
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -130,6 +183,20 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def simplify(self, model=None):
+        conjuncts = flatten(And, [c.simplify(model) for c in self.conjuncts])
+        if FALSE in conjuncts or contradictory(conjuncts):
+            return FALSE
+        conjuncts = [c for c in conjuncts if c != TRUE]
+        if not conjuncts:
+            return TRUE
+        if len(conjuncts) == 1:
+            return conjuncts[0]
+        return And(*conjuncts)
+
+    def size(self):
+        return 1 + sum(conjunct.size() for conjunct in self.conjuncts)
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -160,6 +227,20 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def simplify(self, model=None):
+        disjuncts = flatten(Or, [d.simplify(model) for d in self.disjuncts])
+        if TRUE in disjuncts or contradictory(disjuncts):
+            return TRUE
+        disjuncts = [d for d in disjuncts if d != FALSE]
+        if not disjuncts:
+            return FALSE
+        if len(disjuncts) == 1:
+            return disjuncts[0]
+        return Or(*disjuncts)
+
+    def size(self):
+        return 1 + sum(disjunct.size() for disjunct in self.disjuncts)
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -192,6 +273,20 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def simplify(self, model=None):
+        antecedent = self.antecedent.simplify(model)
+        consequent = self.consequent.simplify(model)
+        if antecedent == FALSE or consequent == TRUE or antecedent == consequent:
+            return TRUE
+        if antecedent == TRUE:
+            return consequent
+        if consequent == FALSE:
+            return Not(antecedent).simplify()
+        return Implication(antecedent, consequent)
+
+    def size(self):
+        return 1 + self.antecedent.size() + self.consequent.size()
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -226,6 +321,115 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def simplify(self, model=None):
+        left = self.left.simplify(model)
+        right = self.right.simplify(model)
+        if left == right:
+            return TRUE
+        if complementary(left, right):
+            return FALSE
+        if isinstance(left, Constant):
+            return right if left.value else Not(right).simplify()
+        if isinstance(right, Constant):
+            return left if right.value else Not(left).simplify()
+        return Biconditional(left, right)
+
+    def size(self):
+        return 1 + self.left.size() + self.right.size()
+
+
+def flatten(cls, operands):
+    """
+    Flattens nested sentences of type `cls` into a single list of operands,
+    dropping duplicates while keeping the original order.
+    """
+    flat = []
+    for operand in operands:
+        if isinstance(operand, And) and cls is And:
+            flat.extend(flatten(cls, operand.conjuncts))
+        elif isinstance(operand, Or) and cls is Or:
+            flat.extend(flatten(cls, operand.disjuncts))
+        else:
+            flat.append(operand)
+    return list(dict.fromkeys(flat))
+
+
+def complementary(a, b):
+    """Checks if one sentence is the negation of the other."""
+    return (isinstance(a, Not) and a.operand == b) or (
+        isinstance(b, Not) and b.operand == a
+    )
+
+
+def contradictory(operands):
+    """Checks if a list of operands contains a sentence and its negation."""
+    operands = set(operands)
+    return any(
+        isinstance(operand, Not) and operand.operand in operands
+        for operand in operands
+    )
+
+
+def literal(sentence):
+    """
+    Returns a (name, value) pair if the sentence is a literal,
+    i.e. a symbol or a negated symbol, otherwise None.
+    """
+    if isinstance(sentence, Symbol):
+        return sentence.name, True
+    if isinstance(sentence, Not) and isinstance(sentence.operand, Symbol):
+        return sentence.operand.name, False
+    return None
+
+
+def simplify(knowledge):
+    """
+    Simplifies a knowledge base: normalizes negations, flattens nested
+    conjunctions and disjunctions, folds constants, removes duplicate
+    operands and substitutes the value of every unit literal asserted by
+    the knowledge base into the remaining sentences.
+    """
+    knowledge = knowledge.simplify()
+
+    while isinstance(knowledge, And):
+
+        # Collect the literals asserted at the top level
+        units = dict()
+        for conjunct in knowledge.conjuncts:
+            unit = literal(conjunct)
+            if unit is None:
+                continue
+            name, value = unit
+            if units.get(name, value) != value:
+                return FALSE
+            units[name] = value
+
+        if not units:
+            break
+
+        # Keep the unit literals and substitute them everywhere else
+        conjuncts = [
+            conjunct if literal(conjunct) else conjunct.simplify(units)
+            for conjunct in knowledge.conjuncts
+        ]
+        simplified = And(*conjuncts).simplify()
+        if simplified == knowledge:
+            break
+        knowledge = simplified
+
+    return knowledge
+
+
+def simplification_report(original, simplified):
+    """
+    Returns a dictionary comparing the size and the number of symbols
+    of a sentence before and after simplification.
+    """
+    return {
+        "size": (original.size(), simplified.size()),
+        "symbols": (len(original.symbols()), len(simplified.symbols())),
+    }
+
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
@@ -264,3 +468,105 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def enumerate_models(knowledge, symbols=None):
+    """
+    Generates, one at a time, every model of the knowledge base over
+    `symbols` (by default, the symbols of the knowledge base).
+    Branches in which the knowledge base is already false are pruned.
+    """
+    if symbols is None:
+        symbols = knowledge.symbols()
+    missing = knowledge.symbols() - set(symbols)
+    if missing:
+        raise Exception(f"variables {missing} not in symbols")
+
+    def extend(knowledge, remaining, model):
+        """Generates every model extending a partial model."""
+
+        # Knowledge base can't be true in any extension of the model
+        if knowledge == FALSE:
+            return
+
+        # Model has an assignment for each symbol
+        if not remaining:
+            yield dict(model)
+            return
+
+        # Assign the next symbol both ways, simplifying the knowledge base
+        p = remaining[0]
+        for value in (True, False):
+            model[p] = value
+            yield from extend(knowledge.simplify({p: value}), remaining[1:], model)
+        del model[p]
+
+    yield from extend(knowledge.simplify(), sorted(symbols), dict())
+
+
+def count_models(knowledge, symbols=None):
+    """
+    Returns the number of models of the knowledge base over `symbols`
+    (by default, the symbols of the knowledge base), without enumerating them.
+    Independent components are counted separately and cached.
+    """
+    if symbols is None:
+        symbols = knowledge.symbols()
+    missing = knowledge.symbols() - set(symbols)
+    if missing:
+        raise Exception(f"variables {missing} not in symbols")
+
+    cache = dict()
+
+    def count(sentence):
+        """Counts models of a simplified sentence over its own symbols."""
+        if isinstance(sentence, Constant):
+            return int(sentence.value)
+        if sentence in cache:
+            return cache[sentence]
+
+        components = split_components(sentence)
+        if len(components) > 1:
+            total = 1
+            for component in components:
+                total *= count(component)
+        else:
+
+            # Branch on one symbol, counting symbols that vanished as free
+            names = sentence.symbols()
+            p = min(names)
+            total = 0
+            for value in (True, False):
+                branch = sentence.simplify({p: value})
+                free = len(names) - 1 - len(branch.symbols())
+                total += count(branch) * 2**free
+
+        cache[sentence] = total
+        return total
+
+    knowledge = knowledge.simplify()
+    return count(knowledge) * 2 ** (len(set(symbols)) - len(knowledge.symbols()))
+
+
+def split_components(sentence):
+    """
+    Splits a conjunction into conjunctions that share no symbols.
+    """
+    if not isinstance(sentence, And):
+        return [sentence]
+
+    # Group conjuncts that are connected through their symbols
+    groups = []
+    for conjunct in sentence.conjuncts:
+        names = conjunct.symbols()
+        conjuncts = [conjunct]
+        for group in [g for g in groups if g[0] & names]:
+            groups.remove(group)
+            names |= group[0]
+            conjuncts = group[1] + conjuncts
+        groups.append((names, conjuncts))
+
+    return [
+        conjuncts[0] if len(conjuncts) == 1 else And(*conjuncts)
+        for _, conjuncts in groups
+    ]
@@ -0,0 +1,327 @@
+from logic import *
+
+# Multiplier applied to the activity bump after every conflict
+ACTIVITY_GROWTH = 1.05
+
+
+class Solver:
+    """
+    Conflict-driven clause learning SAT solver over clauses of integer
+    literals, where variable `v` is written `v` and its negation `-v`.
+    Clauses, learned clauses and facts propagated without assumptions
+    persist across calls to `solve`.
+    """
+
+    def __init__(self):
+        self.variables = 0
+        self.clauses = []
+        self.learned = 0
+
+        # Clauses watching each literal, by index in self.clauses
+        self.watches = dict()
+
+        # Current partial assignment
+        self.values = dict()
+        self.levels = dict()
+        self.reasons = dict()
+        self.trail = []
+        self.trail_limits = []
+        self.propagated = 0
+
+        # Branching heuristic state
+        self.activity = dict()
+        self.bump = 1.0
+        self.phases = dict()
+
+        # Set once the clauses are unsatisfiable regardless of assumptions
+        self.inconsistent = False
+
+    def new_variable(self):
+        """Creates a new variable and returns it."""
+        self.variables += 1
+        self.activity[self.variables] = 0.0
+        self.watches[self.variables] = []
+        self.watches[-self.variables] = []
+        return self.variables
+
+    def value(self, literal):
+        """Returns the value of a literal, or None if unassigned."""
+        value = self.values.get(abs(literal))
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def add_clause(self, clause):
+        """Adds a clause that must hold from now on."""
+        self.backtrack(0)
+        if self.inconsistent:
+            return
+
+        # Drop literals known to be false and clauses known to be true
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause or self.value(literal) for literal in clause):
+            return
+        clause = [literal for literal in clause if self.value(literal) is None]
+
+        if not clause:
+            self.inconsistent = True
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.inconsistent = True
+        else:
+            self.attach(clause)
+
+    def attach(self, clause):
+        """Stores a clause, watching its first two literals."""
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def assign(self, literal, reason):
+        """Makes a literal true at the current decision level."""
+        self.values[abs(literal)] = literal > 0
+        self.levels[abs(literal)] = len(self.trail_limits)
+        self.reasons[abs(literal)] = reason
+        self.trail.append(literal)
+
+    def backtrack(self, level):
+        """Undoes every assignment made above a decision level."""
+        if len(self.trail_limits) <= level:
+            return
+        limit = self.trail_limits[level]
+        for literal in self.trail[limit:]:
+            self.phases[abs(literal)] = literal > 0
+            del self.values[abs(literal)]
+        del self.trail[limit:]
+        del self.trail_limits[level:]
+        self.propagated = min(self.propagated, limit)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses.
+        Returns the index of a conflicting clause, or None.
+        """
+        while self.propagated < len(self.trail):
+            false_literal = -self.trail[self.propagated]
+            self.propagated += 1
+
+            watchers = self.watches[false_literal]
+            self.watches[false_literal] = kept = []
+            for position, index in enumerate(watchers):
+                clause = self.clauses[index]
+
+                # Keep the false literal as the second watch
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                # Clause is already satisfied by its other watch
+                if self.value(clause[0]):
+                    kept.append(index)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+
+                    # Clause is unit, or all its literals are false
+                    if self.value(clause[0]) is None:
+                        self.assign(clause[0], index)
+                    else:
+                        kept.extend(watchers[position + 1:])
+                        return index
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives a clause from a conflict, cutting at the first unique
+        implication point. Returns the clause and the level to backjump to.
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learned = []
+        pending = 0
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump_activity(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(literal)
+
+            # Resolve with the reason of the latest literal involved
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned = [-literal] + learned
+        backjump = max((self.levels[abs(lit)] for lit in learned[1:]), default=0)
+        return learned, backjump
+
+    def bump_activity(self, variable):
+        """Makes a variable involved in a conflict more likely to be chosen."""
+        self.activity[variable] += self.bump
+        if self.activity[variable] > 1e100:
+            for v in self.activity:
+                self.activity[v] *= 1e-100
+            self.bump *= 1e-100
+
+    def solve(self, assumptions=()):
+        """
+        Checks if the clauses are satisfiable when every literal
+        in `assumptions` is true.
+        """
+        self.backtrack(0)
+        if self.inconsistent:
+            return False
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+
+                # Conflict without any decision: clauses are unsatisfiable
+                if not self.trail_limits:
+                    self.inconsistent = True
+                    return False
+
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+
+                    # Watch the asserting literal and the deepest other literal
+                    deepest = max(
+                        range(1, len(learned)),
+                        key=lambda k: self.levels[abs(learned[k])],
+                    )
+                    learned[1], learned[deepest] = learned[deepest], learned[1]
+                    self.assign(learned[0], self.attach(learned))
+                self.learned += 1
+                self.bump *= ACTIVITY_GROWTH
+                continue
+
+            # Assumptions are the first decisions
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                if self.value(literal) is False:
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if self.value(literal) is None:
+                    self.assign(literal, None)
+                continue
+
+            # Branch on the most active unassigned variable
+            unassigned = [v for v in self.activity if v not in self.values]
+            if not unassigned:
+                return True
+            variable = max(unassigned, key=self.activity.get)
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable if self.phases.get(variable) else -variable, None)
+
+
+class KnowledgeBase:
+    """
+    Incremental knowledge base. Sentences are encoded into clauses once,
+    guarded by a selector variable each, so they can be retracted later
+    while the solver keeps every clause it has learned.
+    """
+
+    def __init__(self, *sentences):
+        self.solver = Solver()
+
+        # Literal encoding each symbol and each sentence seen so far
+        self.literals = dict()
+
+        # Selector variable and sentence of each active assertion
+        self.assertions = dict()
+
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """
+        Asserts a sentence. Returns a handle that can be used to retract it.
+        """
+        Sentence.validate(sentence)
+        selector = self.solver.new_variable()
+        self.solver.add_clause([-selector, self.encode(sentence)])
+        self.assertions[selector] = sentence
+        return selector
+
+    def retract(self, handle):
+        """Removes a previously asserted sentence from the knowledge base."""
+        del self.assertions[handle]
+
+        # Disabling the selector for good satisfies every clause it guards
+        self.solver.add_clause([-handle])
+
+    def sentences(self):
+        """Returns the list of sentences currently asserted."""
+        return list(self.assertions.values())
+
+    def satisfiable(self):
+        """Checks if the knowledge base has at least one model."""
+        return self.solver.solve(list(self.assertions))
+
+    def ask(self, query):
+        """Checks if knowledge base entails query."""
+        Sentence.validate(query)
+        return not self.solver.solve(list(self.assertions) + [-self.encode(query)])
+
+    def encode(self, sentence):
+        """
+        Returns a literal equivalent to a sentence, adding the clauses
+        that define it the first time the sentence is seen.
+        """
+        if isinstance(sentence, Not):
+            return -self.encode(sentence.operand)
+        key = sentence.name if isinstance(sentence, Symbol) else sentence
+        if key in self.literals:
+            return self.literals[key]
+
+        x = self.solver.new_variable()
+        clauses = []
+        if isinstance(sentence, Constant):
+            clauses.append([x if sentence.value else -x])
+        elif isinstance(sentence, And):
+            operands = [self.encode(c) for c in sentence.conjuncts]
+            clauses.extend([-x, a] for a in operands)
+            clauses.append([x] + [-a for a in operands])
+        elif isinstance(sentence, Or):
+            operands = [self.encode(d) for d in sentence.disjuncts]
+            clauses.extend([x, -a] for a in operands)
+            clauses.append([-x] + operands)
+        elif isinstance(sentence, Implication):
+            a = self.encode(sentence.antecedent)
+            b = self.encode(sentence.consequent)
+            clauses.extend([[-x, -a, b], [x, a], [x, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.encode(sentence.left)
+            b = self.encode(sentence.right)
+            clauses.extend([[-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]])
+
+        for clause in clauses:
+            self.solver.add_clause(clause)
+        self.literals[key] = x
+        return x
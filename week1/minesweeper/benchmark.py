@@ -0,0 +1,180 @@
+import multiprocessing
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Ways of choosing a move when no safe move is known
+STRATEGIES = ["random", "informed"]
+
+# MinesweeperAI modes that can be enabled from the command line
+MODES = ["bitmask", "linear", "compact"]
+
+
+def main():
+
+    # Check for proper usage
+    usage = (
+        "Usage: python benchmark.py games height width mines [strategy] "
+        "[--bitmask] [--linear] [--compact] [--profile] [--processes=N]"
+    )
+    arguments = [a for a in sys.argv[1:] if not a.startswith("--")]
+    flags = [a[2:] for a in sys.argv[1:] if a.startswith("--")]
+    if len(arguments) not in [4, 5]:
+        sys.exit(usage)
+    games, height, width, mines = map(int, arguments[:4])
+    strategy = arguments[4] if len(arguments) == 5 else "informed"
+    if strategy not in STRATEGIES:
+        sys.exit(f"Strategy must be one of: {', '.join(STRATEGIES)}")
+
+    options = dict()
+    profile = False
+    processes = None
+    for flag in flags:
+        if flag in MODES:
+            options[flag] = True
+        elif flag == "profile":
+            profile = True
+        elif flag.startswith("processes="):
+            processes = int(flag.split("=", 1)[1])
+        else:
+            sys.exit(usage)
+
+    results = benchmark(
+        games, height, width, mines, strategy, processes, options, profile
+    )
+
+    # Print results
+    print(f"Games: {results['games']} ({height}x{width}, {mines} mines"
+          + "".join(f", {mode}" for mode in options) + ")")
+    print(f"Win rate: {results['win_rate']:.2%}")
+    print(f"Moves per second: {results['moves_per_second']:.1f}")
+    print(f"Time per add_knowledge: {results['add_knowledge_time'] * 1000:.3f}ms")
+    print(f"Knowledge base size: {results['mean_knowledge']:.1f} mean, "
+          f"{results['max_knowledge']} max")
+    print("Knowledge base size by move: " + " ".join(
+        f"{size:.1f}" for size in results["knowledge_by_move"]
+    ))
+    inference = results["inference"]
+    if inference is None:
+        return
+    for counter in ["passes", "comparisons", "inferred", "resolved"]:
+        print(f"{counter.capitalize()} per call: "
+              f"{inference[counter] / max(inference['calls'], 1):.2f}")
+
+
+def play(game_settings):
+    """
+    Play one game without any interface.
+
+    `game_settings` is a tuple
+    `(seed, height, width, mines, strategy, options, profile)`, where
+    `options` are keyword arguments for `MinesweeperAI` and `profile`
+    is whether to record inference statistics.
+    Return a dictionary with whether the game was won, the number of
+    moves made, the total time spent choosing and playing moves, the time
+    taken by each call to `add_knowledge`, the number of sentences in
+    the knowledge base after each move, and the inference statistics,
+    or None if they were not recorded.
+    """
+    seed, height, width, mines, strategy, options, profile = game_settings
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, **options)
+    stats = ai.profile() if profile else None
+
+    revealed = 0
+    add_knowledge_times = []
+    knowledge_sizes = []
+    start = time.perf_counter()
+
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            if strategy == "informed":
+                move = ai.make_informed_move(mines)
+            else:
+                move = ai.make_random_move()
+        if move is None or game.is_mine(move):
+            break
+
+        # Make move and update AI knowledge
+        revealed += 1
+        before = time.perf_counter()
+        ai.add_knowledge(move, game.nearby_mines(move))
+        add_knowledge_times.append(time.perf_counter() - before)
+        knowledge_sizes.append(len(ai.sentences))
+
+    return {
+        "won": revealed == height * width - mines,
+        "moves": revealed,
+        "time": time.perf_counter() - start,
+        "add_knowledge_times": add_knowledge_times,
+        "knowledge_sizes": knowledge_sizes,
+        "inference": stats.summary() if stats else None,
+    }
+
+
+def benchmark(games, height, width, mines, strategy="informed", processes=None,
+              options=None, profile=False):
+    """
+    Play `games` games, seeded 0 through games - 1, across a pool of
+    `processes` worker processes (by default, one per CPU), with an AI
+    created with keyword arguments `options`. Inference statistics are
+    only recorded if `profile` is true, since recording them slows
+    every move down.
+
+    Return a dictionary of aggregate statistics over all games.
+    """
+    options = options or dict()
+    settings = [
+        (seed, height, width, mines, strategy, options, profile)
+        for seed in range(games)
+    ]
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(play, settings)
+
+    moves = sum(result["moves"] for result in results)
+    seconds = sum(result["time"] for result in results)
+    add_knowledge_times = [t for r in results for t in r["add_knowledge_times"]]
+    knowledge_sizes = [s for r in results for s in r["knowledge_sizes"]]
+
+    return {
+        "games": games,
+        "win_rate": sum(result["won"] for result in results) / games,
+        "moves_per_second": moves / seconds if seconds else 0,
+        "add_knowledge_time": (
+            sum(add_knowledge_times) / len(add_knowledge_times)
+            if add_knowledge_times else 0
+        ),
+        "mean_knowledge": (
+            sum(knowledge_sizes) / len(knowledge_sizes) if knowledge_sizes else 0
+        ),
+        "max_knowledge": max(knowledge_sizes, default=0),
+        "knowledge_by_move": knowledge_by_move(results),
+        "inference": {
+            counter: sum(r["inference"][counter] for r in results)
+            for counter in results[0]["inference"]
+        } if profile else None,
+    }
+
+
+def knowledge_by_move(results):
+    """
+    Return the average knowledge base size after each move number,
+    over the games that lasted that long.
+    """
+    averages = []
+    longest = max((len(r["knowledge_sizes"]) for r in results), default=0)
+    for move in range(longest):
+        sizes = [
+            r["knowledge_sizes"][move] for r in results
+            if move < len(r["knowledge_sizes"])
+        ]
+        averages.append(sum(sizes) / len(sizes))
+    return averages
+
+
+if __name__ == "__main__":
+    main()
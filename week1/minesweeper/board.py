@@ -0,0 +1,175 @@
+import numpy as np
+
+
+class ArrayMinesweeper:
+    """
+    Minesweeper game representation backed by NumPy arrays, with the
+    same interface as `Minesweeper`. Mines are placed with a single
+    random permutation and every neighbor count is computed up front,
+    so even very large boards are quick to create and to query.
+    """
+
+    def __init__(self, height=8, width=8, mines=8, seed=None):
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+
+        # Place mines at the first positions of a random permutation
+        rng = np.random.default_rng(seed)
+        positions = rng.permutation(height * width)[:mines]
+        self.board = np.zeros((height, width), dtype=bool)
+        self.board.flat[positions] = True
+
+        # Count mines around every cell at once
+        self.counts = neighbor_counts(self.board)
+
+        # Keep track of revealed cells, and of regions without nearby mines
+        self.revealed = np.zeros((height, width), dtype=bool)
+        self.regions = None
+
+        # At first, player has found no mines
+        self.mines_found = set()
+        self.mine_cells = None
+
+    @property
+    def mines(self):
+        """
+        Set of cells containing a mine, built the first time it is needed.
+        """
+        if self.mine_cells is None:
+            self.mine_cells = set(zip(*map(np.ndarray.tolist, np.nonzero(self.board))))
+        return self.mine_cells
+
+    def print(self):
+        """
+        Prints a text-based representation
+        of where mines are located.
+        """
+        for row in self.board:
+            print("--" * self.width + "-")
+            print("".join("|X" if mine else "| " for mine in row) + "|")
+        print("--" * self.width + "-")
+
+    def is_mine(self, cell):
+        i, j = cell
+        return bool(self.board[i, j])
+
+    def nearby_mines(self, cell):
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        i, j = cell
+        return int(self.counts[i, j])
+
+    def reveal(self, cell):
+        """
+        Reveals a cell that is not a mine and, if it has no nearby mines,
+        every cell connected to it through cells without nearby mines.
+        Returns a dictionary mapping each newly revealed cell to its
+        number of nearby mines.
+        """
+        i, j = cell
+        if self.board[i, j] or self.revealed[i, j]:
+            return dict()
+
+        if self.counts[i, j]:
+            mask = np.zeros_like(self.revealed)
+            mask[i, j] = True
+        else:
+
+            # Label regions the first time they are needed
+            if self.regions is None:
+                self.regions = zero_regions((self.counts == 0) & ~self.board)
+
+            # The region and every cell bordering it
+            mask = dilate(self.regions == self.regions[i, j])
+
+        mask &= ~self.revealed
+        self.revealed |= mask
+        rows, cols = np.nonzero(mask)
+        return dict(zip(
+            zip(rows.tolist(), cols.tolist()), self.counts[rows, cols].tolist()
+        ))
+
+    def won(self):
+        """
+        Checks if all mines have been flagged.
+        """
+        return self.mines_found == self.mines
+
+
+def neighbor_counts(board):
+    """
+    Returns an array with the number of mines around each cell of a
+    boolean board, computed as a 2D convolution with a 3x3 kernel
+    whose center is zero.
+    """
+    height, width = board.shape
+    padded = np.pad(board.astype(np.int8), 1)
+    counts = np.zeros((height, width), dtype=np.int8)
+    for di in range(3):
+        for dj in range(3):
+            if (di, dj) != (1, 1):
+                counts += padded[di:di + height, dj:dj + width]
+    return counts
+
+
+def dilate(mask):
+    """
+    Returns a boolean mask extended by one cell in every direction.
+    """
+    height, width = mask.shape
+    padded = np.pad(mask, 1)
+    dilated = np.zeros_like(mask)
+    for di in range(3):
+        for dj in range(3):
+            dilated |= padded[di:di + height, dj:dj + width]
+    return dilated
+
+
+def zero_regions(zero):
+    """
+    Returns an array labeling each cell of a boolean mask with the
+    smallest flat index in its 8-connected region, or -1 outside the mask.
+
+    Regions are found with vectorized hooking and pointer jumping,
+    which converges in few passes over the board regardless of shape.
+    """
+    height, width = zero.shape
+    labels = np.arange(height * width)
+    index = labels.reshape(height, width)
+
+    # Pairs of neighboring cells that are both in the mask
+    pairs = []
+    for a, b in [
+        (np.s_[:, :-1], np.s_[:, 1:]),
+        (np.s_[:-1, :], np.s_[1:, :]),
+        (np.s_[:-1, :-1], np.s_[1:, 1:]),
+        (np.s_[:-1, 1:], np.s_[1:, :-1]),
+    ]:
+        both = zero[a] & zero[b]
+        pairs.append((index[a][both], index[b][both]))
+    first = np.concatenate([a for a, _ in pairs])
+    second = np.concatenate([b for _, b in pairs])
+
+    while True:
+
+        # Hook the larger root of each differing pair onto the smaller one
+        a, b = labels[first], labels[second]
+        differ = a != b
+        if not differ.any():
+            break
+        np.minimum.at(labels, np.maximum(a, b)[differ], np.minimum(a, b)[differ])
+
+        # Point every cell directly at its root
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+    labels[~zero.ravel()] = -1
+    return labels.reshape(height, width)
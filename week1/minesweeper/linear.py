@@ -0,0 +1,106 @@
+import numpy as np
+
+from probability import split_components
+
+
+def linear_deductions(sentences):
+    """
+    Deduce safe cells and mines by treating sentences as linear equations
+    over 0/1 variables, one per cell.
+
+    Sentences are split into components that share no cells, and each
+    component is solved on its own, small, dense matrix.
+
+    Return a tuple `(safes, mines)` of sets of cells.
+    """
+    constraints = [(frozenset(s.cells), s.count) for s in sentences if s]
+    safes, mines = set(), set()
+    for component in split_components(constraints):
+
+        # A lone sentence forces nothing unless its count is 0 or its size
+        if len(component) == 1:
+            cells, count = component[0]
+            if count == 0:
+                safes |= cells
+            elif count == len(cells):
+                mines |= cells
+            continue
+
+        component_safes, component_mines = solve(component)
+        safes |= component_safes
+        mines |= component_mines
+    return safes, mines
+
+
+def solve(constraints):
+    """
+    Deduce safe cells and mines from a list of (cells, count) constraints.
+
+    The equations are reduced with fraction-free Gaussian elimination,
+    which combines overlapping sentences that the subset rule can't.
+    Each reduced equation is then checked against the bounds its
+    coefficients allow, which forces some variables to 0 or 1.
+
+    Return a tuple `(safes, mines)` of sets of cells.
+    """
+    # Build one row per constraint, with the count as the last column
+    cells = sorted(set().union(*[cells for cells, _ in constraints]))
+    column = {cell: n for n, cell in enumerate(cells)}
+    matrix = np.zeros((len(constraints), len(cells) + 1), dtype=np.int64)
+    for row, (constraint_cells, count) in enumerate(constraints):
+        matrix[row, [column[cell] for cell in constraint_cells]] = 1
+        matrix[row, -1] = count
+
+    matrix = reduce(matrix)
+    coefficients, counts = matrix[:, :-1], matrix[:, -1:]
+
+    # Lowest and highest value each equation's left side can take
+    lowest = np.where(coefficients < 0, coefficients, 0).sum(axis=1, keepdims=True)
+    highest = np.where(coefficients > 0, coefficients, 0).sum(axis=1, keepdims=True)
+
+    # A variable is 0 if setting it to 1 makes the equation impossible, and vice versa
+    positive, negative = coefficients > 0, coefficients < 0
+    zero = (positive & (lowest + coefficients > counts)) | (
+        negative & (highest + coefficients < counts)
+    )
+    one = (positive & (highest - coefficients < counts)) | (
+        negative & (lowest - coefficients > counts)
+    )
+
+    safes = {cells[n] for n in np.flatnonzero(zero.any(axis=0))}
+    mines = {cells[n] for n in np.flatnonzero(one.any(axis=0))}
+    return safes, mines
+
+
+def reduce(matrix):
+    """
+    Return the reduced row echelon form of an integer matrix, computed
+    without fractions: rows are combined with integer multiples and
+    divided by the greatest common divisor of their entries.
+    """
+    matrix = matrix.copy()
+    rank = 0
+    for col in range(matrix.shape[1] - 1):
+        rows = np.flatnonzero(matrix[rank:, col]) + rank
+        if not len(rows):
+            continue
+
+        # Move the pivot row into place
+        matrix[[rank, rows[0]]] = matrix[[rows[0], rank]]
+        pivot = matrix[rank]
+
+        # Eliminate the column from every other row at once
+        others = np.flatnonzero(matrix[:, col])
+        others = others[others != rank]
+        if len(others):
+            factors = matrix[others, col:col + 1]
+            matrix[others] = matrix[others] * pivot[col] - factors * pivot
+
+            # Keep entries small
+            divisors = np.gcd.reduce(matrix[others], axis=1, keepdims=True)
+            matrix[others] //= np.maximum(divisors, 1)
+
+        rank += 1
+        if rank == matrix.shape[0]:
+            break
+    return matrix
@@ -1,5 +1,10 @@
 import itertools
+import json
 import random
+import sys
+import time
+
+from probability import TIME_BUDGET, mine_probabilities
 
 
 class Minesweeper:
@@ -101,12 +106,47 @@ class Sentence:
     def __bool__(self):
         return bool(self.cells)
 
+    def __len__(self):
+        return len(self.cells)
+
     def __hash__(self):
         return hash((frozenset(self.cells), self.count))
 
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
+    def cells_key(self):
+        """
+        Returns an immutable key identifying the sentence's current content.
+        """
+        return frozenset(self.cells), self.count
+
+    def members(self):
+        """
+        Returns the keys under which the AI indexes the sentence's cells.
+        """
+        return self.cells
+
+    def remove(self, cell):
+        """
+        Removes a cell, which must be in the sentence, given its index key.
+        """
+        self.cells.remove(cell)
+
+    def is_proper_subset(self, other):
+        """
+        Checks if the cells of the sentence are a proper subset of
+        the cells of another sentence.
+        """
+        return self.cells < other.cells
+
+    def difference(self, other):
+        """
+        Returns the sentence inferred by removing another sentence,
+        whose cells are a subset of this one, from this sentence.
+        """
+        return Sentence(self.cells - other.cells, self.count - other.count)
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
@@ -141,17 +181,328 @@ class Sentence:
             self.cells.remove(cell)
 
 
+class BitSentence:
+    """
+    Logical statement about a Minesweeper game, storing its set of
+    board cells as the bits of an integer. Cell (i, j) is numbered
+    i * width + j, and bit n of the integer stands for the cell numbered
+    offset + n, where offset is the number of the sentence's first cell,
+    so the integer only spans the rows the sentence covers.
+    Subset tests, differences and hashing are then word-level bit
+    operations instead of set operations, and the AI indexes the
+    sentence by cell number, so cells are only decoded once they are
+    known to be safes or mines. The hash is cached until a cell is removed,
+    so the count should only change along with the cells.
+    """
+
+    __slots__ = ("bits", "offset", "count", "width", "numbers", "hash")
+
+    def __init__(self, cells, count, width):
+        self.count = count
+        self.width = width
+        self.hash = None
+
+        # Numbers of the cells, kept so they are decoded from the bits at most once
+        self.numbers = [i * width + j for i, j in cells]
+        self.offset = min(self.numbers, default=0)
+        bits = 0
+        for number in self.numbers:
+            bits |= 1 << (number - self.offset)
+        self.bits = bits
+
+    @classmethod
+    def from_bits(cls, bits, count, width, offset=0, numbers=None):
+        """
+        Returns a sentence directly from its bitmask, whose bit n
+        stands for the cell numbered offset + n, and optionally
+        from the list of its cell numbers, if already known.
+        """
+        sentence = cls.__new__(cls)
+        sentence.count = count
+        sentence.width = width
+        sentence.numbers = numbers
+        sentence.hash = None
+        sentence.normalize(bits, offset)
+        return sentence
+
+    def normalize(self, bits, offset):
+        """
+        Stores a bitmask, shifted so that its lowest bit is set.
+        """
+        self.hash = None
+        if not bits:
+            self.bits, self.offset = 0, 0
+            return
+        shift = (bits & -bits).bit_length() - 1
+        self.bits = bits >> shift
+        self.offset = offset + shift
+
+    def aligned(self, other):
+        """
+        Returns the bitmasks of the sentence and of another sentence,
+        shifted to a common offset.
+        """
+        shift = self.offset - other.offset
+        if shift >= 0:
+            return self.bits << shift, other.bits
+        return self.bits, other.bits << -shift
+
+    @property
+    def cells(self):
+        """
+        Set of board cells in the sentence.
+        """
+        return {divmod(n, self.width) for n in self.members()}
+
+    def __eq__(self, other):
+        return self.cells_key() == other.cells_key()
+
+    def __bool__(self):
+        return bool(self.bits)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __hash__(self):
+        if self.hash is None:
+            self.hash = hash(self.cells_key())
+        return self.hash
+
+    def __str__(self):
+        return f"{self.cells} = {self.count}"
+
+    def cells_key(self):
+        """
+        Returns an immutable key identifying the sentence's current content.
+        """
+        return self.offset, self.bits, self.count
+
+    def members(self):
+        """
+        Returns the keys under which the AI indexes the sentence's cells,
+        which are the numbers of its cells.
+        """
+        if self.numbers is None:
+            self.numbers = []
+            bits = self.bits
+            while bits:
+                lowest = bits & -bits
+                self.numbers.append(self.offset + lowest.bit_length() - 1)
+                bits ^= lowest
+        return self.numbers
+
+    def is_proper_subset(self, other):
+        """
+        Checks if the cells of the sentence are a proper subset of
+        the cells of another sentence.
+        """
+        shift = self.offset - other.offset
+        if shift < 0:
+            return False
+        bits = self.bits << shift
+        return bits != other.bits and not bits & ~other.bits
+
+    def difference(self, other):
+        """
+        Returns the sentence inferred by removing another sentence,
+        whose cells are a subset of this one, from this sentence.
+        """
+        bits, other_bits = self.aligned(other)
+        return BitSentence.from_bits(
+            bits & ~other_bits,
+            self.count - other.count,
+            self.width,
+            min(self.offset, other.offset),
+        )
+
+    def known_mines(self):
+        """
+        Returns the set of all cells in self.cells known to be mines.
+        """
+        if self.count == self.bits.bit_count():
+            return self.cells
+        return set()
+
+    def known_safes(self):
+        """
+        Returns the set of all cells in self.cells known to be safe.
+        """
+        if self.count == 0:
+            return self.cells
+        return set()
+
+    def remove(self, number):
+        """
+        Removes a cell, which must be in the sentence, given its index key.
+        """
+        if self.numbers is not None:
+            self.numbers.remove(number)
+        self.hash = None
+        n = number - self.offset
+        if n:
+            self.bits ^= 1 << n
+        else:
+            self.normalize(self.bits ^ 1, self.offset)
+
+    def mark_mine(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be a mine.
+        """
+        number = cell[0] * self.width + cell[1]
+        n = number - self.offset
+        if n >= 0 and self.bits >> n & 1:
+            self.remove(number)
+            self.count -= 1
+
+    def mark_safe(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be safe.
+        """
+        number = cell[0] * self.width + cell[1]
+        n = number - self.offset
+        if n >= 0 and self.bits >> n & 1:
+            self.remove(number)
+
+
+class CellPool:
+    """
+    Set of cells supporting constant-time insertion, removal
+    and random selection, by keeping cells in a list and removing
+    a cell by swapping it with the last one.
+    """
+
+    def __init__(self, cells=()):
+        self.cells = []
+        self.positions = dict()
+        for cell in cells:
+            self.add(cell)
+
+    def __contains__(self, cell):
+        return cell in self.positions
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def add(self, cell):
+        if cell not in self.positions:
+            self.positions[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        position = self.positions.pop(cell, None)
+        if position is None:
+            return
+        last = self.cells.pop()
+        if position < len(self.cells):
+            self.cells[position] = last
+            self.positions[last] = position
+
+    def choice(self):
+        """
+        Returns a random cell from the pool, or None if it is empty.
+        """
+        return random.choice(self.cells) if self.cells else None
+
+
+class InferenceStats:
+    """
+    Counters describing the work done by MinesweeperAI inference,
+    both in total and for each call to `add_knowledge`, optionally
+    written as one JSON line per call to a trace file, which is
+    closed by `close` or on leaving a `with` block.
+    """
+
+    # Counters kept for each call
+    COUNTERS = ("passes", "comparisons", "inferred", "resolved")
+
+    def __init__(self, trace=None):
+        self.calls = 0
+        self.seconds = 0.0
+        self.totals = {counter: 0 for counter in self.COUNTERS}
+        self.moves = []
+        self.current = None
+        self.known = 0
+        self.started = 0.0
+        self.trace = open(trace, "w") if trace else None
+
+    def start(self, ai, cell, count):
+        """
+        Starts recording a call to `add_knowledge`.
+        """
+        self.current = {"cell": list(cell), "count": count}
+        self.current.update({counter: 0 for counter in self.COUNTERS})
+        self.known = len(ai.safes) + len(ai.mines)
+        self.started = time.perf_counter()
+
+    def count(self, counter, amount=1):
+        """
+        Adds to a counter, both in total and for the current call.
+        """
+        self.totals[counter] += amount
+        if self.current is not None:
+            self.current[counter] += amount
+
+    def stop(self, ai):
+        """
+        Finishes recording a call to `add_knowledge`.
+        """
+        self.current["seconds"] = time.perf_counter() - self.started
+        self.count("resolved", len(ai.safes) + len(ai.mines) - self.known)
+        self.current["sentences"] = len(ai.sentences)
+        self.calls += 1
+        self.seconds += self.current["seconds"]
+        self.moves.append(self.current)
+        if self.trace:
+            self.trace.write(json.dumps(self.current) + "\n")
+        self.current = None
+
+    def summary(self):
+        """
+        Returns a dictionary with the total of every counter, the number
+        of calls recorded and the total time spent in them.
+        """
+        return {"calls": self.calls, "seconds": self.seconds, **self.totals}
+
+    def close(self):
+        """
+        Closes the trace file, if any.
+        """
+        if self.trace:
+            self.trace.close()
+            self.trace = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
 class MinesweeperAI:
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, bitmask=False, linear=False, compact=False):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Whether sentences store their cells as bitmasks
+        self.bitmask = bitmask
+
+        # Whether to also deduce by solving sentences as linear equations
+        self.linear = linear
+
+        # Whether to compact the knowledge base after every move
+        self.compact = compact
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -159,8 +510,75 @@ class MinesweeperAI:
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Safe cells not chosen yet, and cells neither chosen nor known mines
+        self.safe_moves = CellPool()
+        self.unknown = CellPool(
+            (i, j) for i in range(self.height) for j in range(self.width)
+        )
+
+        # Sentences about the game known to be true, by identifier
+        self.sentences = dict()
+        self.ids = itertools.count()
+
+        # Identifiers of the sentences mentioning each cell, keyed by cell,
+        # or by bit number when sentences store their cells as bitmasks
+        self.index = dict()
+
+        # Identifier of the sentence with given cells and count
+        self.keys = dict()
+
+        # Identifiers of sentences not examined since they last changed
+        self.pending = set()
+
+        # Identifiers of sentences added or changed since the last compaction
+        self.changed = set()
+
+        # Identifiers of sentences added or changed since the last linear deduction
+        self.unsolved = set()
+
+        # Mine configurations enumerated for each group of sentences
+        self.configurations = dict()
+
+        # Inference statistics, only recorded once profiling is enabled
+        self.stats = None
+
+    def profile(self, trace=None):
+        """
+        Enables recording inference statistics, optionally writing a
+        line per move to the file named `trace`, and returns them.
+        Statistics recorded so far are closed and replaced.
+        """
+        if self.stats is not None:
+            self.stats.close()
+        self.stats = InferenceStats(trace)
+        return self.stats
+
+    @property
+    def knowledge(self):
+        """
+        List of sentences about the game known to be true
+
+        The list is a copy of the knowledge base: assign a new list to
+        replace the knowledge base, rather than modifying the list in place.
+        """
+        return list(self.sentences.values())
+
+    @knowledge.setter
+    def knowledge(self, sentences):
+        self.sentences.clear()
+        self.index.clear()
+        self.keys.clear()
+        self.pending.clear()
+        self.changed.clear()
+        self.unsolved.clear()
+        for sentence in sentences:
+            self.insert(sentence)
+
+    def index_key(self, cell):
+        """
+        Returns the key under which sentences mentioning a cell are indexed.
+        """
+        return cell[0] * self.width + cell[1] if self.bitmask else cell
 
     def mark_mine(self, cell):
         """
@@ -168,8 +586,14 @@ class MinesweeperAI:
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.unknown.discard(cell)
+        key = self.index_key(cell)
+        for sentence_id in self.index.pop(key, ()):
+            sentence = self.sentences[sentence_id]
+            del self.keys[sentence.cells_key()]
+            sentence.remove(key)
+            sentence.count -= 1
+            self.refresh(sentence_id)
 
     def mark_safe(self, cell):
         """
@@ -177,14 +601,78 @@ class MinesweeperAI:
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if cell not in self.moves_made:
+            self.safe_moves.add(cell)
+        key = self.index_key(cell)
+        for sentence_id in self.index.pop(key, ()):
+            sentence = self.sentences[sentence_id]
+            del self.keys[sentence.cells_key()]
+            sentence.remove(key)
+            self.refresh(sentence_id)
+
+    def insert(self, sentence):
+        """
+        Adds a sentence to the knowledge base, unless it is empty
+        or already known, and schedules it to be examined.
+        Returns whether the sentence was added.
+        """
+        key = sentence.cells_key()
+        if not sentence or key in self.keys:
+            return False
+
+        sentence_id = next(self.ids)
+        self.sentences[sentence_id] = sentence
+        self.keys[key] = sentence_id
+        for key in sentence.members():
+            self.index.setdefault(key, set()).add(sentence_id)
+        self.pending.add(sentence_id)
+        self.unsolved.add(sentence_id)
+        if self.compact:
+            self.changed.add(sentence_id)
+        return True
+
+    def refresh(self, sentence_id):
+        """
+        Re-registers a sentence whose cells changed, dropping it
+        if it became empty or a repeat of another sentence.
+        """
+        sentence = self.sentences[sentence_id]
+        key = sentence.cells_key()
+        if sentence and key not in self.keys:
+            self.keys[key] = sentence_id
+            self.pending.add(sentence_id)
+            self.unsolved.add(sentence_id)
+            if self.compact:
+                self.changed.add(sentence_id)
+            return
+
+        # Remove empty and repeated sentences
+        self.remove(sentence_id)
+
+    def remove(self, sentence_id):
+        """
+        Removes a sentence from the knowledge base.
+        """
+        sentence = self.sentences.pop(sentence_id)
+        if self.keys.get(sentence.cells_key()) == sentence_id:
+            del self.keys[sentence.cells_key()]
+        self.pending.discard(sentence_id)
+        self.changed.discard(sentence_id)
+        self.unsolved.discard(sentence_id)
+        for key in sentence.members():
+            self.index[key].discard(sentence_id)
 
     def add_sentence(self, cell, count):
         """
         Adds a new sentence to the AI's knowledge base
         """
         neighbors = set()
+
+        # With bitmasks, cells are numbered from the top left neighbor
+        numbers = []
+        bits = 0
+        offset = (cell[0] - 1) * self.width + cell[1] - 1
+
         # Loop over all cells within one row and column
         for i in range(cell[0] - 1, cell[0] + 2):
             for j in range(cell[1] - 1, cell[1] + 2):
@@ -197,75 +685,113 @@ class MinesweeperAI:
                 if 0 <= i < self.height and 0 <= j < self.width:
                     if (i, j) in self.mines:
                         count -= 1
-                    elif (i, j) not in self.safes:
+                    elif (i, j) in self.safes:
+                        continue
+                    elif self.bitmask:
+                        number = i * self.width + j
+                        numbers.append(number)
+                        bits |= 1 << (number - offset)
+                    else:
                         neighbors.add((i, j))
 
-        self.knowledge.append(Sentence(neighbors, count))
+        if self.bitmask:
+            self.insert(
+                BitSentence.from_bits(bits, count, self.width, offset, numbers)
+            )
+        else:
+            self.insert(Sentence(neighbors, count))
 
     def update_knowledge(self):
         """
         Updates the AI's knowledge base by marking any
         additional cells as safes or mines and by
         inferring new sentences
+
+        Only sentences that changed since they were last examined are
+        examined again, and only against sentences sharing a cell with them.
+        With linear deduction enabled, once no sentence is left to examine,
+        the sentences connected to any sentence that changed since the
+        last time are also combined as linear equations.
         """
-        # Informs whether the knowledge was updated in the last iteraton
-        was_updated = True
-
-        while was_updated:
-            was_updated = False
-            safes_found = set()
-            mines_found = set()
-            inferred_sentences = []
-
-            for sentence in self.knowledge:
-                known_safes = sentence.known_safes()
-                known_mines = sentence.known_mines()
-
-                if known_safes or known_mines:
-                    was_updated = True
-                    # mark any additional cells as safes
-                    safes_found.update(known_safes)
-                    # mark any additional cells as mines
-                    mines_found.update(known_mines)
-                    # No need to verify possible inferences for current sentence.
-                    continue
+        while True:
+            while self.pending:
+                self.examine(self.pending.pop())
 
-                # add new inferred sentences
-                for sentence2 in self.knowledge:
-                    # Ignore the sentence itself
-                    if sentence == sentence2:
-                        continue
+            # Combine overlapping sentences the subset rule can't relate
+            if not (self.linear and self.deduce_linearly()):
+                break
 
-                    # Ignore if sentence2 is not a subset of sentence
-                    if not sentence2.cells.issubset(sentence.cells):
-                        continue
-
-                    # Infer new sentence
-                    cells = sentence.cells.difference(sentence2.cells)
-                    count = sentence.count - sentence2.count
-                    new_sentence = Sentence(cells, count)
-
-                    # If the new sentence has not yet been inferred
-                    if not (
-                        new_sentence in self.knowledge
-                        or new_sentence in inferred_sentences
-                    ):
-                        inferred_sentences.append(new_sentence)
-                        was_updated = True
-
-            # Mark the safes found
-            for safe in safes_found:
+    def examine(self, sentence_id):
+        """
+        Marks the cells a sentence determines, or otherwise infers new
+        sentences from it and the sentences sharing a cell with it.
+        """
+        sentence = self.sentences[sentence_id]
+        if self.stats is not None:
+            self.stats.count("passes")
+
+        # Mark any additional cells as safes or as mines
+        if sentence.count == 0 or sentence.count == len(sentence):
+            known_safes = list(sentence.known_safes())
+            known_mines = list(sentence.known_mines())
+            for safe in known_safes:
                 self.mark_safe(safe)
-
-            # Mark the mines found
-            for mine in mines_found:
+            for mine in known_mines:
                 self.mark_mine(mine)
-
-            # Add inferred sentences
-            self.knowledge.extend(inferred_sentences)
-
-            # Remove empty and repeated sentences
-            self.knowledge = list(filter(None, set(self.knowledge)))
+            # No need to verify possible inferences for current sentence.
+            return
+
+        # Sentences that might be a subset or a superset of the sentence
+        overlapping = set()
+        for key in sentence.members():
+            overlapping.update(self.index[key])
+        overlapping.discard(sentence_id)
+
+        # Add new inferred sentences
+        inferred = 0
+        for other_id in overlapping:
+            other = self.sentences[other_id]
+            if other.is_proper_subset(sentence):
+                inferred += self.insert(sentence.difference(other))
+            elif sentence.is_proper_subset(other):
+                inferred += self.insert(other.difference(sentence))
+
+        if self.stats is not None:
+            self.stats.count("comparisons", len(overlapping))
+            self.stats.count("inferred", inferred)
+
+    def deduce_linearly(self):
+        """
+        Marks the cells found to be safes or mines by solving sentences
+        as a system of linear equations. Only groups of sentences linked by
+        shared cells to a sentence added or changed since the last call are
+        solved, as the other groups already yielded nothing.
+        Returns whether any cell was marked.
+        """
+        from linear import linear_deductions
+
+        sentences = self.connected(self.unsolved)
+        self.unsolved.clear()
+        safes, mines = linear_deductions(sentences)
+        for safe in safes:
+            self.mark_safe(safe)
+        for mine in mines:
+            self.mark_mine(mine)
+        return bool(safes or mines)
+
+    def connected(self, sentence_ids):
+        """
+        Returns the sentences linked through shared cells
+        to any of the sentences with given identifiers.
+        """
+        seen = set(sentence_ids)
+        stack = list(seen)
+        while stack:
+            for key in self.sentences[stack.pop()].members():
+                for other_id in self.index[key] - seen:
+                    seen.add(other_id)
+                    stack.append(other_id)
+        return [self.sentences[sentence_id] for sentence_id in seen]
 
     def add_knowledge(self, cell, count):
         """
@@ -282,14 +808,108 @@ class MinesweeperAI:
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
+        if self.stats is not None:
+            self.stats.start(self, cell, count)
         # mark the cell as a move that has been made
         self.moves_made.add(cell)
+        self.safe_moves.discard(cell)
+        self.unknown.discard(cell)
         # mark the cell as safe
         self.mark_safe(cell)
         # add a new sentence to the AI's knowledge base based on the value of `cell` and `count`
         self.add_sentence(cell, count)
         # mark any additional cells as safe or as mines and add new inferred sentences
         self.update_knowledge()
+        # drop sentences that no longer carry information of their own
+        if self.compact:
+            self.compact_knowledge()
+        if self.stats is not None:
+            self.stats.stop(self)
+
+    def compact_knowledge(self, sentence_ids=None):
+        """
+        Removes redundant sentences from the knowledge base: a sentence
+        is removed if a proper subset of it and the remaining difference
+        are both known sentences and no other sentence shares any of its
+        cells. The subset rule could only ever derive the difference from
+        it, so removing it never loses a deduction.
+
+        Only sentences in `sentence_ids`, and the sentences sharing cells
+        with them, are checked. By default, those are the sentences added
+        or changed since the last compaction, which compact mode records;
+        pass `self.sentences` to check every sentence.
+
+        Returns the number of sentences removed.
+        """
+        if sentence_ids is None:
+            sentence_ids = self.changed
+        size = len(self.sentences)
+
+        # A changed sentence may be what makes a larger neighbour redundant
+        candidates = set()
+        for sentence_id in sentence_ids:
+            if sentence_id in self.sentences:
+                candidates.add(sentence_id)
+                candidates.update(self.overlapping(sentence_id))
+
+        for sentence_id in candidates:
+            if sentence_id in self.sentences and self.redundant(sentence_id):
+                self.remove(sentence_id)
+
+        self.changed.clear()
+        return size - len(self.sentences)
+
+    def overlapping(self, sentence_id):
+        """
+        Returns the ids of the other sentences sharing a cell with the
+        sentence `sentence_id`.
+        """
+        overlapping = set()
+        for key in self.sentences[sentence_id].members():
+            overlapping.update(self.index[key])
+        overlapping.discard(sentence_id)
+        return overlapping
+
+    def redundant(self, sentence_id):
+        """
+        Returns True if the sentence `sentence_id` overlaps exactly two
+        other sentences, one a proper subset of it and the other the
+        remaining difference.
+        """
+        overlapping = self.overlapping(sentence_id)
+        if len(overlapping) != 2:
+            return False
+        sentence = self.sentences[sentence_id]
+        for other_id in overlapping:
+            other = self.sentences[other_id]
+            if other.is_proper_subset(sentence):
+                key = sentence.difference(other).cells_key()
+                return self.keys.get(key) in overlapping
+        return False
+
+    def knowledge_stats(self):
+        """
+        Returns a dictionary describing the size of the knowledge base:
+        the number of sentences, the total number of cells they mention,
+        the number of entries in the cell index, and an estimate of the
+        memory used by all of them, in bytes.
+        """
+        memory = sum(
+            sys.getsizeof(structure)
+            for structure in (self.sentences, self.keys, self.index, self.pending)
+        )
+        memory += sum(sys.getsizeof(ids) for ids in self.index.values())
+        for sentence in self.sentences.values():
+            memory += sys.getsizeof(sentence)
+            memory += sys.getsizeof(
+                sentence.bits if self.bitmask else sentence.cells
+            )
+        return {
+            "sentences": len(self.sentences),
+            "cells": sum(len(s) for s in self.sentences.values()),
+            "index_entries": sum(len(ids) for ids in self.index.values()),
+            "memory": memory,
+        }
 
     def make_safe_move(self):
         """
@@ -300,8 +920,7 @@ class MinesweeperAI:
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        safe_moves = [safe for safe in self.safes if safe not in self.moves_made]
-        return random.choice(safe_moves) if safe_moves else None
+        return self.safe_moves.choice()
 
     def make_random_move(self):
         """
@@ -310,10 +929,36 @@ class MinesweeperAI:
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        moves = [
-            (i, j)
-            for i in range(self.height)
-            for j in range(self.width)
-            if (i, j) not in self.moves_made and (i, j) not in self.mines
-        ]
-        return random.choice(moves) if moves else None
+        return self.unknown.choice()
+
+    def make_informed_move(self, mines, time_budget=TIME_BUDGET):
+        """
+        Returns a move to make on the Minesweeper board, given that
+        it has `mines` mines in total.
+        Should choose, among cells that have not already been chosen
+        and are not known to be mines, one of the cells least likely
+        to be a mine according to the AI's knowledge.
+
+        Cells certain to be mines are marked as mines, and None is
+        returned if every remaining cell is one.
+        """
+        probabilities = mine_probabilities(
+            self, mines, time_budget, self.configurations
+        )
+        certain = [cell for cell, p in probabilities.items() if p >= 1]
+        if certain:
+            for cell in certain:
+                self.mark_mine(cell)
+                del probabilities[cell]
+            self.update_knowledge()
+
+            # Marking mines may have revealed safe cells
+            safe = self.make_safe_move()
+            if safe is not None:
+                return safe
+        if not probabilities:
+            return None
+        lowest = min(probabilities.values())
+        return random.choice(
+            [cell for cell, p in probabilities.items() if p == lowest]
+        )
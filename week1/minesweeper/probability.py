@@ -0,0 +1,214 @@
+import math
+import time
+
+# Seconds allowed for enumerating mine configurations before estimating
+TIME_BUDGET = 0.5
+
+# Largest frontier component enumerated exactly, in cells
+MAX_COMPONENT = 400
+
+
+class BudgetExceeded(Exception):
+    """Raised when exact enumeration runs out of time."""
+
+
+def mine_probabilities(ai, mines, time_budget=TIME_BUDGET, cache=None):
+    """
+    Return a dictionary mapping every cell that has not been chosen and
+    is not known to be a mine to the probability of it being a mine,
+    given the AI's knowledge and that the board has `mines` mines in total.
+
+    The frontier (cells mentioned by some sentence) is split into
+    independent components, the consistent mine configurations of each
+    component are enumerated, and configurations are weighted by the
+    number of ways of placing the remaining mines in the other cells.
+    If enumeration takes longer than `time_budget` seconds, probabilities
+    are estimated from the sentences instead.
+    """
+    deadline = time.perf_counter() + time_budget
+    constraints = [(frozenset(s.cells), s.count) for s in ai.knowledge]
+    frontier = set().union(*[cells for cells, _ in constraints])
+
+    # Cells that are neither chosen, known, nor mentioned by any sentence
+    interior = [
+        cell for cell in ai.unknown if cell not in ai.safes and cell not in frontier
+    ]
+    remaining = mines - len(ai.mines)
+
+    probabilities = {safe: 0 for safe in ai.safe_moves}
+    try:
+        solutions = [
+            solve_component(component, deadline, cache)
+            for component in split_components(constraints)
+        ]
+        probabilities.update(combine(solutions, interior, remaining))
+    except BudgetExceeded:
+        probabilities.update(estimate(constraints, interior, remaining))
+    return probabilities
+
+
+def split_components(constraints):
+    """
+    Split constraints into groups that share no cells.
+    """
+    groups = []
+    for cells, count in constraints:
+        members = [(cells, count)]
+        covered = set(cells)
+        for group in [g for g in groups if g[0] & covered]:
+            groups.remove(group)
+            covered |= group[0]
+            members.extend(group[1])
+        groups.append((covered, members))
+    return [members for _, members in groups]
+
+
+def solve_component(constraints, deadline, cache=None):
+    """
+    Enumerate the mine configurations consistent with a component's
+    constraints.
+
+    Return a tuple `(cells, ways, hits)`, where `ways[k]` is the number of
+    configurations with `k` mines, and `hits[k][n]` is how many of those
+    have a mine in `cells[n]`.
+    """
+    key = frozenset(constraints)
+    if cache is not None and key in cache:
+        return cache[key]
+
+    # Order cells so that neighbouring cells are assigned consecutively
+    cells = []
+    seen = set()
+    for component_cells, _ in sorted(constraints, key=lambda c: min(c[0])):
+        for cell in sorted(component_cells):
+            if cell not in seen:
+                seen.add(cell)
+                cells.append(cell)
+    if len(cells) > MAX_COMPONENT:
+        raise BudgetExceeded
+
+    # Track, for each constraint, mines still needed and cells still free
+    position = {cell: n for n, cell in enumerate(cells)}
+    needed = [count for _, count in constraints]
+    free = [len(c) for c, _ in constraints]
+    touching = [[] for _ in cells]
+    for c, (component_cells, _) in enumerate(constraints):
+        for cell in component_cells:
+            touching[position[cell]].append(c)
+
+    ways = [0] * (len(cells) + 1)
+    hits = [[0] * len(cells) for _ in range(len(cells) + 1)]
+    assignment = [False] * len(cells)
+    visits = 0
+
+    def backtrack(n, mines):
+        """Assign cells from position `n` on, with `mines` placed so far."""
+        nonlocal visits
+        visits += 1
+        if visits % 1024 == 0 and time.perf_counter() > deadline:
+            raise BudgetExceeded
+
+        if n == len(cells):
+            ways[mines] += 1
+            for m, is_mine in enumerate(assignment):
+                if is_mine:
+                    hits[mines][m] += 1
+            return
+
+        for is_mine in (False, True):
+
+            # Check every constraint on the cell can still be satisfied
+            consistent = True
+            for c in touching[n]:
+                free[c] -= 1
+                needed[c] -= is_mine
+                if needed[c] < 0 or needed[c] > free[c]:
+                    consistent = False
+            if consistent:
+                assignment[n] = is_mine
+                backtrack(n + 1, mines + is_mine)
+            for c in touching[n]:
+                free[c] += 1
+                needed[c] += is_mine
+        assignment[n] = False
+
+    backtrack(0, 0)
+    result = (cells, ways, hits)
+    if cache is not None:
+        cache[key] = result
+    return result
+
+
+def convolve(distributions):
+    """
+    Return the number of ways of placing each total number of mines
+    across independent components, given the ways of each component.
+    """
+    total = [1]
+    for ways in distributions:
+        combined = [0] * (len(total) + len(ways) - 1)
+        for a, x in enumerate(total):
+            if x:
+                for b, y in enumerate(ways):
+                    combined[a + b] += x * y
+        total = combined
+    return total
+
+
+def placements(cells, mines):
+    """
+    Return the number of ways of placing `mines` mines among `cells` cells.
+    """
+    if mines < 0 or mines > cells:
+        return 0
+    return math.comb(cells, mines)
+
+
+def combine(solutions, interior, remaining):
+    """
+    Return the probability of each cell being a mine, weighting each
+    component configuration by the ways of placing the remaining mines.
+    """
+    everything = convolve([ways for _, ways, _ in solutions])
+    weights = [placements(len(interior), remaining - t) for t in range(len(everything))]
+    total = sum(w * x for w, x in zip(weights, everything))
+    if total == 0:
+        raise BudgetExceeded
+
+    probabilities = dict()
+    for s, (cells, ways, hits) in enumerate(solutions):
+        others = convolve([w for r, (_, w, _) in enumerate(solutions) if r != s])
+        for n, cell in enumerate(cells):
+            mine_weight = sum(
+                hits[k][n] * x * placements(len(interior), remaining - k - f)
+                for k in range(len(ways))
+                if hits[k][n]
+                for f, x in enumerate(others)
+            )
+            probabilities[cell] = mine_weight / total
+
+    # Interior cells share the expected number of mines left outside the frontier
+    if interior:
+        expected = sum(
+            w * x * (remaining - t) for t, (w, x) in enumerate(zip(weights, everything))
+        )
+        for cell in interior:
+            probabilities[cell] = expected / total / len(interior)
+    return probabilities
+
+
+def estimate(constraints, interior, remaining):
+    """
+    Return rough mine probabilities: each frontier cell gets the highest
+    mine density among the sentences mentioning it, and interior cells
+    get the density of the mines not accounted for by the frontier.
+    """
+    probabilities = dict()
+    for cells, count in constraints:
+        for cell in cells:
+            probabilities[cell] = max(probabilities.get(cell, 0), count / len(cells))
+    if interior:
+        density = max(0, remaining - sum(probabilities.values())) / len(interior)
+        for cell in interior:
+            probabilities[cell] = min(1, density)
+    return probabilities
@@ -2,12 +2,17 @@ import pygame
 import sys
 import time
 
+from concurrent.futures import ThreadPoolExecutor
+
 from minesweeper import Minesweeper, MinesweeperAI
 
 HEIGHT = 8
 WIDTH = 8
 MINES = 8
 
+# Seconds between moves while the AI plays on its own
+AUTOPLAY_DELAY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+
 # Colors
 BLACK = (0, 0, 0)
 GRAY = (180, 180, 180)
@@ -41,11 +46,35 @@ mine = pygame.transform.scale(mine, (cell_size, cell_size))
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
 ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
 
+# AI work runs on a single worker thread, in the order it is submitted,
+# so that a slow inference never freezes the window
+worker = ThreadPoolExecutor(max_workers=1)
+thinking = None
+
+
+def choose_move(ai):
+    """
+    Returns the AI's next move, or None if there are no moves left,
+    along with a message describing how it was chosen.
+    """
+    move = ai.make_safe_move()
+    if move is not None:
+        return move, "AI making safe move."
+    move = ai.make_informed_move(MINES)
+    if move is None:
+        return None, "No moves left to make."
+    return move, "No known safe moves, AI making least risky move."
+
+
 # Keep track of revealed cells, flagged cells, and if a mine was hit
 revealed = set()
 flags = set()
 lost = False
 
+# Keep track of whether the AI is playing on its own, and when it last moved
+autoplay = False
+last_autoplay = 0
+
 # Show instructions initially
 instructions = True
 
@@ -54,6 +83,7 @@ while True:
     # Check if game quit
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            worker.shutdown(wait=False, cancel_futures=True)
             sys.exit()
 
     screen.fill(BLACK)
@@ -152,11 +182,25 @@ while True:
     pygame.draw.rect(screen, WHITE, resetButton)
     screen.blit(buttonText, buttonRect)
 
+    # Autoplay button
+    autoplayButton = pygame.Rect(
+        (2 / 3) * width + BOARD_PADDING, (1 / 3) * height + 90,
+        (width / 3) - BOARD_PADDING * 2, 50
+    )
+    buttonText = mediumFont.render("Stop" if autoplay else "Autoplay", True, BLACK)
+    buttonRect = buttonText.get_rect()
+    buttonRect.center = autoplayButton.center
+    pygame.draw.rect(screen, WHITE, autoplayButton)
+    screen.blit(buttonText, buttonRect)
+
     # Display text
-    text = "Lost" if lost else "Won" if game.mines == flags else ""
+    text = (
+        "Lost" if lost else "Won" if game.mines == flags
+        else "Thinking..." if thinking else ""
+    )
     text = mediumFont.render(text, True, WHITE)
     textRect = text.get_rect()
-    textRect.center = ((5 / 6) * width, (2 / 3) * height)
+    textRect.center = ((5 / 6) * width, (5 / 6) * height)
     screen.blit(text, textRect)
 
     move = None
@@ -178,18 +222,15 @@ while True:
     elif left == 1:
         mouse = pygame.mouse.get_pos()
 
-        # If AI button clicked, make an AI move
+        # If AI button clicked, ask the AI for a move
         if aiButton.collidepoint(mouse) and not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
+            if thinking is None:
+                thinking = worker.submit(choose_move, ai)
+            time.sleep(0.2)
+
+        # Toggle autoplay
+        elif autoplayButton.collidepoint(mouse) and not lost:
+            autoplay = not autoplay
             time.sleep(0.2)
 
         # Reset game state
@@ -199,6 +240,8 @@ while True:
             revealed = set()
             flags = set()
             lost = False
+            autoplay = False
+            thinking = None
             continue
 
         # User-made move
@@ -210,13 +253,37 @@ while True:
                             and (i, j) not in revealed):
                         move = (i, j)
 
-    # Make move and update AI knowledge
-    if move:
+    # Ask the AI for a move if it is playing on its own
+    if (autoplay and thinking is None and not lost
+            and len(revealed) < HEIGHT * WIDTH - MINES
+            and time.time() - last_autoplay >= AUTOPLAY_DELAY):
+        thinking = worker.submit(choose_move, ai)
+        last_autoplay = time.time()
+
+    # Check if the AI finished choosing a move
+    if thinking is not None and thinking.done():
+        ai_move, message = thinking.result()
+        thinking = None
+        print(message)
+        if ai_move is None:
+            flags = ai.mines.copy()
+            autoplay = False
+        elif move is None:
+            move = ai_move
+
+    # Make move and update AI knowledge in the background
+    if move and move not in revealed:
         if game.is_mine(move):
             lost = True
+            autoplay = False
         else:
             nearby = game.nearby_mines(move)
             revealed.add(move)
-            ai.add_knowledge(move, nearby)
+            worker.submit(ai.add_knowledge, move, nearby)
+
+            # Every safe cell is revealed, so the game is won
+            if len(revealed) == HEIGHT * WIDTH - MINES:
+                flags = game.mines.copy()
+                autoplay = False
 
     pygame.display.flip()
@@ -0,0 +1,114 @@
+import csv
+import json
+import multiprocessing
+import os
+import sys
+
+import heredity
+from heredity import compute_probabilities, load_data, load_families
+
+# Engines that can run inside a worker process
+ENGINES = ["enumeration", "elimination", "vectorized"]
+
+# Ways of writing results
+FORMATS = ["csv", "json"]
+
+# Families sent to a worker at a time
+CHUNK_SIZE = 16
+
+# Engine used by this worker process
+worker_engine = None
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python batch.py (directory | families.csv) [engine] [format]")
+    path = sys.argv[1]
+    engine = sys.argv[2] if len(sys.argv) >= 3 else "elimination"
+    if engine not in ENGINES:
+        sys.exit(f"Engine must be one of: {', '.join(ENGINES)}")
+    output = sys.argv[3] if len(sys.argv) == 4 else "csv"
+    if output not in FORMATS:
+        sys.exit(f"Format must be one of: {', '.join(FORMATS)}")
+
+    write(batch(families(path), engine), output, sys.stdout)
+
+
+def families(path):
+    """
+    Generate `(family, source)` pairs for every family in `path`: either
+    a directory with one CSV file per family, named after the file, or a
+    single CSV file with a `family` field. The source is the family's
+    data, or the file to load it from, which is left to the workers.
+    """
+    if os.path.isdir(path):
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith(".csv"):
+                yield os.path.splitext(filename)[0], os.path.join(path, filename)
+    else:
+        yield from load_families(path).items()
+
+
+def initialize(probs, name):
+    """
+    Prepare a worker process once, rather than for every family: use the
+    parent's probabilities, in case they were changed, building the
+    probability tables every family reuses, and the chosen engine.
+    """
+    global worker_engine
+    heredity.PROBS.update(probs)
+    heredity.probability_tables()
+    worker_engine = name
+
+
+def solve(task):
+    """
+    Return a family's name and the distributions of everyone in it.
+    """
+    family, source = task
+    people = load_data(source) if isinstance(source, str) else source
+    return family, compute_probabilities(people, worker_engine)
+
+
+def batch(tasks, engine="elimination", processes=None):
+    """
+    Run inference on every `(family, source)` pair of `tasks` across a pool
+    of `processes` worker processes (by default, one per CPU).
+
+    Generate `(family, probabilities)` pairs in the order of `tasks`,
+    as soon as each family is done.
+    """
+    with multiprocessing.Pool(
+        processes, initializer=initialize, initargs=(heredity.PROBS, engine)
+    ) as pool:
+        yield from pool.imap(solve, tasks, chunksize=CHUNK_SIZE)
+
+
+def write(results, output, f):
+    """
+    Write one line per person to file `f` as they are computed, either
+    as CSV with a header, or as JSON objects, given `(family, probabilities)`
+    pairs.
+    """
+    if output == "csv":
+        writer = csv.writer(f)
+        writer.writerow(["family", "name", "gene_2", "gene_1", "gene_0", "trait"])
+    for family, probabilities in results:
+        for person, distributions in probabilities.items():
+            gene = distributions["gene"]
+            trait = distributions["trait"][True]
+            if output == "csv":
+                writer.writerow([family, person, gene[2], gene[1], gene[0], trait])
+            else:
+                f.write(json.dumps({
+                    "family": family,
+                    "name": person,
+                    "gene": {str(g): gene[g] for g in gene},
+                    "trait": trait,
+                }) + "\n")
+
+
+if __name__ == "__main__":
+    main()
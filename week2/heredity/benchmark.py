@@ -0,0 +1,263 @@
+import csv
+import json
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+
+from heredity import (
+    child_gene_probability, enumerate_probabilities, joint_probability, load_data,
+    parallel_probabilities, powerset, probability_tables
+)
+
+# Times each snippet is run
+REPEAT = 100000
+
+# Largest families solved by engines that enumerate every joint assignment
+MAX_ENUMERATION = 10
+MAX_VECTORIZED = 13
+
+# Largest junction tree cluster solved exactly, as cluster tables have 3^k entries
+MAX_CLUSTER = 10
+
+# Probability that someone after the first generation marries into the family
+MARRY_IN = 0.3
+
+# Ways of forming couples in generated families
+MATINGS = ["random", "monogamous"]
+
+
+def main():
+
+    # Check for proper usage
+    usage = ("Usage: python benchmark.py cpt [data.csv]\n"
+             "       python benchmark.py pedigree size depth evidence [seed] [mating]\n"
+             "       python benchmark.py generate size depth evidence [seed] [mating]")
+    if len(sys.argv) < 2 or sys.argv[1] not in ["cpt", "pedigree", "generate"]:
+        sys.exit(usage)
+
+    if sys.argv[1] == "cpt":
+        if len(sys.argv) not in [2, 3]:
+            sys.exit(usage)
+        people = load_data(sys.argv[2]) if len(sys.argv) == 3 else None
+        for name, seconds in cpt_benchmark(people).items():
+            print(f"{name}: {seconds * 1e6:.3f}us")
+        return
+
+    if len(sys.argv) not in [5, 6, 7]:
+        sys.exit(usage)
+    size, depth = int(sys.argv[2]), int(sys.argv[3])
+    evidence = float(sys.argv[4])
+    seed = int(sys.argv[5]) if len(sys.argv) >= 6 else 0
+    mating = sys.argv[6] if len(sys.argv) == 7 else "random"
+    if mating not in MATINGS:
+        sys.exit(f"Mating must be one of: {', '.join(MATINGS)}")
+    people = generate_pedigree(size, depth, evidence, seed, mating == "monogamous")
+
+    if sys.argv[1] == "generate":
+        write_data(people, sys.stdout)
+    else:
+        print(json.dumps({
+            "size": size,
+            "depth": depth,
+            "evidence": evidence,
+            "seed": seed,
+            "mating": mating,
+            "largest_cluster": largest_cluster(people),
+            "engines": engine_benchmark(people),
+        }, indent=2))
+
+
+def cpt_benchmark(people=None, repeat=REPEAT):
+    """
+    Return the average time, in seconds, of looking up all 27 inheritance
+    probabilities by arithmetic with `child_gene_probability` and by
+    indexing the cached tables, and, given `people`, of computing
+    `joint_probability` for one of their joint assignments.
+    """
+    combinations = [(c, f, m) for c in range(3) for f in range(3) for m in range(3)]
+
+    def arithmetic():
+        for c, f, m in combinations:
+            child_gene_probability(c, f, m)
+
+    def cached():
+        inheritance = probability_tables()["inheritance"]
+        for c, f, m in combinations:
+            inheritance[9 * c + 3 * f + m]
+
+    timings = {
+        "child_gene_probability x27": timeit.timeit(arithmetic, number=repeat) / repeat,
+        "cached tables x27": timeit.timeit(cached, number=repeat) / repeat,
+    }
+    if people:
+        one_gene = next(iter(powerset(people)))
+        two_genes = set(list(people)[:1])
+        have_trait = {person for person in people if people[person]["trait"]}
+        tables = probability_tables()
+        timings["joint_probability"] = timeit.timeit(
+            lambda: joint_probability(people, one_gene, two_genes, have_trait, tables),
+            number=repeat
+        ) / repeat
+    return timings
+
+
+def generate_pedigree(size, depth, evidence, seed=None, monogamous=False):
+    """
+    Return a random family of `size` people over `depth` generations,
+    in the format returned by `heredity.load_data`.
+
+    Everyone in the first generation has no parents listed. Everyone after
+    that is either the child of a random couple from the generation before
+    or, with probability `MARRY_IN`, someone marrying into the family with
+    no parents listed. Each person's trait is known with probability
+    `evidence`, and drawn from their genes, sampled from `PROBS`.
+
+    Couples are drawn at random, so people may have children with several
+    partners, which links branches of the family into large junction tree
+    clusters. If `monogamous` is true, everyone has at most one partner and
+    at most one parent of each couple has parents listed, so the family
+    is tree-shaped.
+    """
+    rng = random.Random(seed)
+    tables = probability_tables()
+    people = dict()
+    genes = dict()
+    generation = []
+    for level in range(depth):
+
+        # Spread people as evenly as possible across generations
+        count = size * (level + 1) // depth - size * level // depth
+        previous = generation
+        if monogamous:
+            couples = monogamous_couples(people, previous, rng)
+        else:
+            couples = [
+                tuple(rng.sample(previous, 2)) for _ in range(len(previous) // 2)
+            ]
+        generation = []
+        for _ in range(count):
+            name = f"P{len(people)}"
+            if couples and rng.random() >= MARRY_IN:
+                father, mother = rng.choice(couples)
+                weights = tables["inheritance"][3 * genes[father] + genes[mother]::9]
+            else:
+                father = mother = None
+                weights = tables["gene"]
+            genes[name] = rng.choices(range(3), weights)[0]
+
+            has_trait = rng.random() < tables["trait"][2 * genes[name] + 1]
+            people[name] = {
+                "name": name,
+                "mother": mother,
+                "father": father,
+                "trait": has_trait if rng.random() < evidence else None,
+            }
+            generation.append(name)
+    return people
+
+
+def monogamous_couples(people, generation, rng):
+    """
+    Return couples pairing everyone in `generation` with parents listed
+    with someone who married into the family, then pairing the remaining
+    people who married in with each other. Nobody is in two couples.
+    """
+    descendants = [p for p in generation if people[p]["father"]]
+    married_in = [p for p in generation if not people[p]["father"]]
+    rng.shuffle(descendants)
+    rng.shuffle(married_in)
+    couples = list(zip(descendants, married_in))
+    rest = married_in[len(couples):]
+    couples += list(zip(rest[::2], rest[1::2]))
+    return couples
+
+
+def write_data(people, f):
+    """
+    Write a family to file `f` as CSV, in the format read by `heredity.load_data`.
+    """
+    writer = csv.writer(f)
+    writer.writerow(["name", "mother", "father", "trait"])
+    for person in people.values():
+        trait = "" if person["trait"] is None else int(person["trait"])
+        writer.writerow([
+            person["name"], person["mother"] or "", person["father"] or "", trait
+        ])
+
+
+def largest_cluster(people):
+    """
+    Return the number of people in the largest cluster of the junction tree
+    of `people`, which bounds the cost of exact inference by elimination.
+    """
+    from elimination import JunctionTree
+
+    return max(len(cluster) for cluster in JunctionTree(people).clusters)
+
+
+def engines(people, exact=True):
+    """
+    Return a dictionary mapping the name of every engine that can solve
+    `people` in reasonable time to a function computing their distributions.
+    Elimination is only included if `exact` is true.
+    """
+    from elimination import infer
+    from sampling import gibbs_sampling, likelihood_weighting
+    from vectorized import vectorized_probabilities
+
+    available = {
+        "likelihood": lambda people: likelihood_weighting(people, seed=0)[0],
+        "gibbs": lambda people: gibbs_sampling(people, seed=0)[0],
+    }
+    if exact:
+        available["elimination"] = infer
+    if len(people) <= MAX_VECTORIZED:
+        available["vectorized"] = vectorized_probabilities
+    if len(people) <= MAX_ENUMERATION:
+        available["enumeration"] = enumerate_probabilities
+        available["parallel"] = parallel_probabilities
+    return available
+
+
+def engine_benchmark(people):
+    """
+    Run every engine able to solve `people` and return, for each, its
+    running time in seconds, the peak memory it allocated in bytes, and
+    the largest absolute difference between its distributions and those
+    of exact inference on a junction tree. If the junction tree has a
+    cluster larger than `MAX_CLUSTER`, exact inference is skipped, and so
+    is elimination, and the difference is None.
+
+    Memory is measured in a second run, since tracing allocations slows
+    everything down, and only covers the current process.
+    """
+    from elimination import infer
+    from sampling import max_error
+
+    exact = largest_cluster(people) <= MAX_CLUSTER
+    reference = infer(people) if exact else None
+    results = dict()
+    for name, engine in engines(people, exact).items():
+        start = time.perf_counter()
+        probabilities = engine(people)
+        seconds = time.perf_counter() - start
+
+        tracemalloc.start()
+        engine(people)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {
+            "seconds": seconds,
+            "peak_memory": peak,
+            "max_error": (
+                max_error(probabilities, reference) if exact else None
+            ),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+import heapq
+import itertools
+
+from heredity import probability_tables
+
+# Possible number of copies of the gene
+GENES = (0, 1, 2)
+
+
+class Factor:
+    """
+    Function from the number of genes of some people to a non-negative
+    number, stored as a table with an entry per joint assignment.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = tuple(variables)
+        self.table = table
+
+    @classmethod
+    def unit(cls):
+        """
+        Return the factor over no variables that is always 1.
+        """
+        return cls((), {(): 1})
+
+    def product(self, other):
+        """
+        Return the product of two factors, over the union of their variables.
+        """
+        variables = self.variables + tuple(
+            v for v in other.variables if v not in self.variables
+        )
+        mine = [variables.index(v) for v in self.variables]
+        theirs = [variables.index(v) for v in other.variables]
+        table = dict()
+        for assignment in itertools.product(GENES, repeat=len(variables)):
+            table[assignment] = (
+                self.table[tuple(assignment[k] for k in mine)]
+                * other.table[tuple(assignment[k] for k in theirs)]
+            )
+        return Factor(variables, table)
+
+    def marginalize(self, variables):
+        """
+        Return the factor over `variables` obtained by summing out
+        every other variable. Variables the factor doesn't depend on
+        are kept, with the same value for every number of genes.
+        """
+        present = [v for v in variables if v in self.variables]
+        positions = [self.variables.index(v) for v in present]
+        summed = dict()
+        for assignment, value in self.table.items():
+            key = tuple(assignment[k] for k in positions)
+            summed[key] = summed.get(key, 0) + value
+
+        table = dict()
+        for assignment in itertools.product(GENES, repeat=len(variables)):
+            genes = dict(zip(variables, assignment))
+            table[assignment] = summed[tuple(genes[v] for v in present)]
+        return Factor(variables, table)
+
+    def normalize(self):
+        """
+        Return the factor scaled so that its entries sum to 1.
+        Messages are normalized to keep their entries from underflowing.
+        """
+        total = sum(self.table.values())
+        return Factor(self.variables, {
+            assignment: value / total for assignment, value in self.table.items()
+        })
+
+
+def gene_factor(people, person):
+    """
+    Return the factor for the number of genes of a person given their
+    parents', or the unconditional probabilities if they have no parents.
+    """
+    father = people[person]["father"]
+    mother = people[person]["mother"]
+
+    # Person has no parents listed in the data set
+    if not (father or mother):
+        gene = probability_tables()["gene"]
+        return Factor((person,), {(g,): gene[g] for g in GENES})
+
+    # Parents missing from the data set are assumed to have no gene
+    parents = known_parents(people, person)
+    inheritance = probability_tables()["inheritance"]
+    table = dict()
+    for assignment in itertools.product(GENES, repeat=1 + len(parents)):
+        genes = dict(zip([person] + parents, assignment))
+        table[assignment] = inheritance[
+            9 * assignment[0] + 3 * genes.get(father, 0) + genes.get(mother, 0)
+        ]
+    return Factor([person] + parents, table)
+
+
+def known_parents(people, person):
+    """
+    Return the parents of a person that appear in the data set.
+    """
+    return [
+        parent for parent in (people[person]["father"], people[person]["mother"])
+        if parent in people
+    ]
+
+
+def trait_factor(person, trait):
+    """
+    Return the factor for the likelihood of an observed trait
+    given the number of genes of a person.
+    """
+    likelihood = probability_tables()["trait"]
+    return Factor((person,), {(g,): likelihood[2 * g + trait] for g in GENES})
+
+
+def elimination_order(people):
+    """
+    Return an order in which to eliminate people, choosing each time
+    the person with the fewest neighbors in the interaction graph
+    (people sharing a factor), which keeps clusters small.
+    """
+    neighbors = {person: set() for person in people}
+    for person in people:
+        family = {person, *known_parents(people, person)}
+        for member in family:
+            neighbors[member] |= family - {member}
+
+    heap = [(len(neighbors[person]), person) for person in people]
+    heapq.heapify(heap)
+    order = []
+    eliminated = set()
+    while heap:
+        degree, person = heapq.heappop(heap)
+        if person in eliminated or degree != len(neighbors[person]):
+            continue
+        order.append(person)
+        eliminated.add(person)
+
+        # Connect the remaining neighbors of the eliminated person
+        for neighbor in neighbors[person]:
+            neighbors[neighbor] |= neighbors[person] - {neighbor}
+            neighbors[neighbor].discard(person)
+            heapq.heappush(heap, (len(neighbors[neighbor]), neighbor))
+    return order
+
+
+class JunctionTree:
+    """
+    Clique tree of a pedigree, built by simulating variable elimination:
+    eliminating each person creates a cluster with everyone sharing a
+    factor with them, linked to the cluster that later consumes the
+    resulting factor. Messages between clusters are computed on demand
+    and cached, so every marginal is available after two passes.
+    """
+
+    def __init__(self, people):
+        self.people = people
+        self.clusters = []
+        self.cluster_of = dict()
+        self.neighbors = []
+        self.separators = dict()
+        self.factors = []
+
+        # Factors not consumed yet, by the people they involve
+        pending = {person: set() for person in people}
+        scopes = dict()
+        gene_factors = {person: gene_factor(people, person) for person in people}
+        for person, factor in gene_factors.items():
+            key = ("factor", person)
+            scopes[key] = set(factor.variables)
+            for variable in factor.variables:
+                pending[variable].add(key)
+
+        for person in elimination_order(people):
+            cluster = len(self.clusters)
+            involved = pending.pop(person)
+            variables = set().union(*[scopes[key] for key in involved])
+            for key in involved:
+                for variable in scopes.pop(key) - {person}:
+                    pending[variable].discard(key)
+
+            # Link cluster to the clusters whose messages it consumes
+            self.neighbors.append([])
+            self.factors.append([])
+            for kind, source in involved:
+                if kind == "factor":
+                    self.factors[cluster].append(gene_factors[source])
+                else:
+                    self.neighbors[cluster].append(source)
+                    self.neighbors[source].append(cluster)
+                    separator = self.clusters[source] - {self.clusters[source].variable}
+                    self.separators[(source, cluster)] = separator
+                    self.separators[(cluster, source)] = separator
+
+            self.clusters.append(Cluster(variables, person))
+            self.cluster_of[person] = cluster
+
+            # Pass on a factor over everyone else in the cluster
+            if len(variables) > 1:
+                key = ("cluster", cluster)
+                scopes[key] = variables - {person}
+                for variable in scopes[key]:
+                    pending[variable].add(key)
+
+        # Order separators consistently, as factor variables are tuples
+        for edge, separator in self.separators.items():
+            self.separators[edge] = tuple(sorted(separator))
+
+        # Observed traits only affect the cluster where each person is eliminated
+        self.evidence = {
+            person: people[person]["trait"]
+            for person in people
+            if people[person]["trait"] is not None
+        }
+        self.potentials = [self.potential(c) for c in range(len(self.clusters))]
+        self.messages = dict()
+
+    def potential(self, cluster):
+        """
+        Return the product of every factor assigned to a cluster,
+        including the likelihood of observed traits.
+        """
+        factor = Factor.unit()
+        for assigned in self.factors[cluster]:
+            factor = factor.product(assigned)
+        person = self.clusters[cluster].variable
+        if person in self.evidence:
+            factor = factor.product(trait_factor(person, self.evidence[person]))
+        return factor
+
+    def observe(self, person, trait):
+        """
+        Set the observed trait of a person, or forget it if `trait` is None.
+        Only the potential of the cluster where the person was eliminated
+        changes, so only cached messages directed away from that cluster
+        are discarded; every other message is reused.
+        """
+        if trait is None:
+            self.evidence.pop(person, None)
+        else:
+            self.evidence[person] = trait
+        cluster = self.cluster_of[person]
+        self.potentials[cluster] = self.potential(cluster)
+
+        # Messages depending on a discarded message were discarded with it
+        # and, otherwise, were never computed
+        frontier = [(cluster, None)]
+        while frontier:
+            source, previous = frontier.pop()
+            for target in self.neighbors[source]:
+                if target != previous and self.messages.pop((source, target), None):
+                    frontier.append((target, source))
+
+    def message(self, source, target):
+        """
+        Return the message from one cluster to a neighboring one,
+        computing first, without recursion, every message it depends on.
+        """
+        stack = [(source, target, False)]
+        while stack:
+            i, j, ready = stack.pop()
+            if (i, j) in self.messages:
+                continue
+            if ready:
+                factor = self.potentials[i]
+                for k in self.neighbors[i]:
+                    if k != j:
+                        factor = factor.product(self.messages[(k, i)])
+                self.messages[(i, j)] = factor.marginalize(
+                    self.separators[(i, j)]
+                ).normalize()
+            else:
+                stack.append((i, j, True))
+                for k in self.neighbors[i]:
+                    if k != j and (k, i) not in self.messages:
+                        stack.append((k, i, False))
+        return self.messages[(source, target)]
+
+    def belief(self, cluster):
+        """
+        Return the unnormalized joint distribution over a cluster's people.
+        """
+        factor = self.potentials[cluster]
+        for neighbor in self.neighbors[cluster]:
+            factor = factor.product(self.message(neighbor, cluster))
+        return factor
+
+    def gene_distribution(self, person):
+        """
+        Return the distribution over the number of genes of a person.
+        """
+        marginal = self.belief(self.cluster_of[person]).marginalize((person,))
+        total = sum(marginal.table.values())
+        return {g: marginal.table[(g,)] / total for g in reversed(GENES)}
+
+
+class Cluster(frozenset):
+    """
+    Set of people in a junction tree cluster, remembering which one
+    was eliminated when it was created.
+    """
+
+    def __new__(cls, people, variable):
+        cluster = super().__new__(cls, people)
+        cluster.variable = variable
+        return cluster
+
+
+def infer(people):
+    """
+    Return, for everyone in `people`, the distributions over their number
+    of genes and over having the trait, given every observed trait.
+    Computed exactly by belief propagation on a junction tree, in the
+    same format produced by `heredity.main`.
+    """
+    return InferenceSession(people).probabilities()
+
+
+class InferenceSession:
+    """
+    Exact inference on a pedigree whose observed traits change over time.
+    The junction tree and its messages are kept between queries, so after
+    a trait is observed, changed or forgotten, only the messages affected
+    by it are computed again.
+    """
+
+    def __init__(self, people):
+        self.people = {person: dict(data) for person, data in people.items()}
+        self.tree = JunctionTree(self.people)
+        self.marginals = dict()
+
+    def set_trait(self, person, trait):
+        """
+        Record that `person` has the trait (True), lacks it (False),
+        or that it is unknown (None).
+        """
+        if self.people[person]["trait"] == trait:
+            return
+        self.people[person]["trait"] = trait
+        self.tree.observe(person, trait)
+        self.marginals.clear()
+
+    def distribution(self, person):
+        """
+        Return the distributions over the number of genes and over having
+        the trait of a single person.
+        """
+        if person not in self.marginals:
+            gene = self.tree.gene_distribution(person)
+            self.marginals[person] = {
+                "gene": gene,
+                "trait": trait_distribution(gene, self.people[person]["trait"]),
+            }
+        return self.marginals[person]
+
+    def probabilities(self):
+        """
+        Return the distributions of everyone, in the format of `infer`.
+        """
+        return {person: self.distribution(person) for person in self.people}
+
+
+def trait_distribution(gene, trait=None):
+    """
+    Return the distribution over having the trait given the distribution
+    over the number of genes, or certainty if the trait was observed.
+    """
+    if trait is not None:
+        return {True: float(trait), False: float(not trait)}
+    likelihood = probability_tables()["trait"]
+    p = sum(gene[g] * likelihood[2 * g + 1] for g in gene)
+    return {True: p, False: 1 - p}
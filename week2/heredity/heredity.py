@@ -1,5 +1,7 @@
 import csv
 import itertools
+import math
+import multiprocessing
 import sys
 
 PROBS = {
@@ -37,59 +39,147 @@ PROBS = {
 }
 
 
+# Probability tables derived from PROBS, and the PROBS they were derived from
+TABLES = None
+TABLES_SOURCE = None
+
+# Ways of computing the probabilities
+ENGINES = ["enumeration", "elimination", "vectorized", "parallel"]
+
+
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python heredity.py data.csv [engine]")
     people = load_data(sys.argv[1])
+    engine = sys.argv[2] if len(sys.argv) == 3 else "enumeration"
+    if engine not in ENGINES:
+        sys.exit(f"Engine must be one of: {', '.join(ENGINES)}")
+
+    probabilities = compute_probabilities(people, engine)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
+def compute_probabilities(people, engine="enumeration"):
+    """
+    Return, for everyone in `people`, the distributions over their number
+    of genes and over having the trait, computed with one of `ENGINES`.
+    """
+    if engine == "elimination":
+        from elimination import infer
+        return infer(people)
+    if engine == "vectorized":
+        from vectorized import vectorized_probabilities
+        return vectorized_probabilities(people)
+    if engine == "parallel":
+        return parallel_probabilities(people)
+    return enumerate_probabilities(people)
+
+
+def enumerate_probabilities(people):
+    """
+    Return, for everyone in `people`, the distributions over their number
+    of genes and over having the trait, by enumerating every joint
+    assignment consistent with the observed traits.
+    """
+    probabilities = partial_probabilities(people)
+
+    # Ensure probabilities sum to 1
+    log_normalize(probabilities)
+    return probabilities
+
+
+def parallel_probabilities(people, processes=None):
+    """
+    Return the same distributions as `enumerate_probabilities`, splitting
+    the joint assignments across a pool of `processes` worker processes
+    (by default, one per CPU). Each task fixes the genes of the first few
+    people, and the partial tables of every task are added up.
+    """
+    processes = processes or multiprocessing.cpu_count()
+
+    # Fix enough people to give every process several tasks
+    names = sorted(people)
+    fixed = 0
+    while fixed < len(names) and 3 ** fixed < 4 * processes:
+        fixed += 1
+    tasks = [
+        (people, dict(zip(names[:fixed], genes)))
+        for genes in itertools.product([0, 1, 2], repeat=fixed)
+    ]
+
+    probabilities = empty_probabilities(people, -math.inf)
+    with multiprocessing.Pool(processes) as pool:
+        for partial in pool.starmap(partial_probabilities, tasks):
+            for person in partial:
+                for field in partial[person]:
+                    distribution = probabilities[person][field]
+                    for value, log_p in partial[person][field].items():
+                        distribution[value] = log_add(distribution[value], log_p)
+
+    # Ensure probabilities sum to 1
+    log_normalize(probabilities)
+    return probabilities
 
-    # Keep track of gene and trait probabilities for each person
-    probabilities = {
+
+def empty_probabilities(people, value=0):
+    """
+    Return gene and trait distributions for everyone in `people`
+    with every probability set to `value`.
+    """
+    return {
         person: {
             "gene": {
-                2: 0,
-                1: 0,
-                0: 0
+                2: value,
+                1: value,
+                0: value
             },
             "trait": {
-                True: 0,
-                False: 0
+                True: value,
+                False: value
             }
         }
         for person in people
     }
-    
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
-
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
 
-    # Ensure probabilities sum to 1
-    normalize(probabilities)
 
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+def partial_probabilities(people, fixed=None):
+    """
+    Return the logarithms of unnormalized distributions for everyone in
+    `people`, summed over every joint assignment in which each person in
+    `fixed` has the number of genes it maps them to.
+    """
+    # Keep track of gene and trait log probabilities for each person
+    probabilities = empty_probabilities(people, -math.inf)
+    fixed = fixed or dict()
+    fixed_one = {person for person in fixed if fixed[person] == 1}
+    fixed_two = {person for person in fixed if fixed[person] == 2}
+
+    # Traits are only summed over analytically, never enumerated
+    names = set(people) - set(fixed)
+    tables = probability_tables()
+
+    # Loop over all sets of people who might have the gene
+    for one in powerset(names):
+        for two in powerset(names - one):
+            one_gene = one | fixed_one
+            two_genes = two | fixed_two
+            # Update probabilities with the log probability of genes and known traits
+            log_p = log_evidence_probability(people, one_gene, two_genes, tables)
+            log_update_marginals(
+                probabilities, people, one_gene, two_genes, log_p, tables
+            )
+
+    return probabilities
 
 
 def load_data(filename):
@@ -103,27 +193,46 @@ def load_data(filename):
     with open(filename) as f:
         reader = csv.DictReader(f)
         for row in reader:
-            name = row["name"]
-            data[name] = {
-                "name": name,
-                "mother": row["mother"] or None,
-                "father": row["father"] or None,
-                "trait": (True if row["trait"] == "1" else
-                          False if row["trait"] == "0" else None)
-            }
+            data[row["name"]] = parse_person(row)
     return data
 
 
+def load_families(filename):
+    """
+    Load several families from a single CSV file into a dictionary mapping
+    each value of its `family` field to that family's data, in the format
+    returned by `load_data`. Names only need to be unique within a family.
+    """
+    families = dict()
+    with open(filename) as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            families.setdefault(row["family"], dict())[row["name"]] = parse_person(row)
+    return families
+
+
+def parse_person(row):
+    """
+    Return the data of a person given their row of a CSV file.
+    """
+    return {
+        "name": row["name"],
+        "mother": row["mother"] or None,
+        "father": row["father"] or None,
+        "trait": (True if row["trait"] == "1" else
+                  False if row["trait"] == "0" else None)
+    }
+
+
 def powerset(s):
     """
-    Return a list of all possible subsets of set s.
+    Generate all possible subsets of set s, one at a time.
     """
     s = list(s)
-    return [
-        set(s) for s in itertools.chain.from_iterable(
-            itertools.combinations(s, r) for r in range(len(s) + 1)
-        )
-    ]
+    for subset in itertools.chain.from_iterable(
+        itertools.combinations(s, r) for r in range(len(s) + 1)
+    ):
+        yield set(subset)
 
 
 def child_gene_probability(child_mutated_genes, father_genes, mother_genes):
@@ -153,9 +262,50 @@ def child_gene_probability(child_mutated_genes, father_genes, mother_genes):
 
     # Probability that both parents pass on a mutated gene
     return p_father * p_mother
-    
 
-def joint_probability(people, one_gene, two_genes, have_trait):
+
+def probability_tables():
+    """
+    Return the probabilities in `PROBS` as flat lists, so that lookups are
+    plain indexed reads:
+        * "gene"[genes] is the probability of a person without parents
+          having `genes` copies of the gene,
+        * "inheritance"[9 * child + 3 * father + mother] is the probability
+          of a child having `child` copies given their parents' copies,
+        * "trait"[2 * genes + trait] is the probability of `trait`
+          given `genes` copies of the gene,
+    along with "log_gene", "log_inheritance" and "log_trait", their logarithms.
+
+    Tables are only rebuilt when `PROBS` has changed since the last call.
+    """
+    global TABLES, TABLES_SOURCE
+    gene, trait = PROBS["gene"], PROBS["trait"]
+    source = (
+        gene[0], gene[1], gene[2],
+        trait[0][False], trait[0][True],
+        trait[1][False], trait[1][True],
+        trait[2][False], trait[2][True],
+        PROBS["mutation"],
+    )
+    if source != TABLES_SOURCE:
+        gene, trait = source[:3], source[3:9]
+        inheritance = tuple(
+            child_gene_probability(c, f, m)
+            for c in range(3) for f in range(3) for m in range(3)
+        )
+        TABLES = {
+            "gene": gene,
+            "inheritance": inheritance,
+            "trait": trait,
+            "log_gene": tuple(map(log, gene)),
+            "log_inheritance": tuple(map(log, inheritance)),
+            "log_trait": tuple(map(log, trait)),
+        }
+        TABLES_SOURCE = source
+    return TABLES
+
+
+def joint_probability(people, one_gene, two_genes, have_trait, tables=None):
     """
     Compute and return a joint probability.
 
@@ -165,7 +315,12 @@ def joint_probability(people, one_gene, two_genes, have_trait):
         * everyone not in `one_gene` or `two_gene` does not have the gene, and
         * everyone in set `have_trait` has the trait, and
         * everyone not in set` have_trait` does not have the trait.
+
+    `tables` may be given to avoid looking up `probability_tables()`,
+    which checks `PROBS` for changes, on every call.
     """
+    tables = tables or probability_tables()
+    gene, inheritance, trait = tables["gene"], tables["inheritance"], tables["trait"]
     p = 1
     for person in people:
         # Determine the number of mutated genes
@@ -177,19 +332,112 @@ def joint_probability(people, one_gene, two_genes, have_trait):
 
         # Person has no parents listed in the data set
         if not (father or mother):
-            p *= PROBS["gene"][mutated_genes]
+            p *= gene[mutated_genes]
         # Person has parents listed in the data set
         else:
             father_genes = 1 if father in one_gene else 2 if father in two_genes else 0 
             mother_genes = 1 if mother in one_gene else 2 if mother in two_genes else 0 
-            p *= child_gene_probability(mutated_genes, father_genes, mother_genes)
+            p *= inheritance[9 * mutated_genes + 3 * father_genes + mother_genes]
         
         # Multiply by the probability of having/not having the trait
-        p *= PROBS["trait"][mutated_genes][person in have_trait]
+        p *= trait[2 * mutated_genes + (person in have_trait)]
     
     return p
 
 
+def log_evidence_probability(people, one_gene, two_genes, tables=None):
+    """
+    Compute and return the natural logarithm of the probability that
+        * everyone in set `one_gene` has one copy of the gene, and
+        * everyone in set `two_genes` has two copies of the gene, and
+        * everyone not in `one_gene` or `two_gene` does not have the gene, and
+        * everyone whose trait is known has or lacks the trait accordingly.
+
+    This is `joint_probability` summed over every possible trait of the
+    people whose trait is unknown.
+    `tables` may be given to avoid looking up `probability_tables()`.
+    """
+    tables = tables or probability_tables()
+    log_gene, log_inheritance = tables["log_gene"], tables["log_inheritance"]
+    log_trait = tables["log_trait"]
+    log_p = 0
+    for person in people:
+        # Determine the number of mutated genes
+        mutated_genes = 1 if person in one_gene else 2 if person in two_genes else 0
+
+        # Retrieve parents' information
+        father = people[person]["father"]
+        mother = people[person]["mother"]
+
+        # Person has no parents listed in the data set
+        if not (father or mother):
+            log_p += log_gene[mutated_genes]
+        # Person has parents listed in the data set
+        else:
+            father_genes = 1 if father in one_gene else 2 if father in two_genes else 0
+            mother_genes = 1 if mother in one_gene else 2 if mother in two_genes else 0
+            log_p += log_inheritance[9 * mutated_genes + 3 * father_genes + mother_genes]
+
+        # Only known traits constrain the probability
+        trait = people[person]["trait"]
+        if trait is not None:
+            log_p += log_trait[2 * mutated_genes + trait]
+
+    return log_p
+
+
+def log_update_marginals(log_probabilities, people, one_gene, two_genes, log_p,
+                         tables=None):
+    """
+    Add to `log_probabilities`, which holds logarithms of probabilities,
+    the probability of a gene assignment and the known traits, given as
+    its logarithm `log_p`. Each person's trait distribution is updated
+    with their known trait or, if unknown, with both possible traits
+    weighted by their probability given the person's genes.
+    `tables` may be given to avoid looking up `probability_tables()`.
+    """
+    log_trait = (tables or probability_tables())["log_trait"]
+    for person in log_probabilities:
+        # Determine the number of mutated genes
+        mutated_genes = 1 if person in one_gene else 2 if person in two_genes else 0
+        # Update probabilities for genes
+        gene = log_probabilities[person]["gene"]
+        gene[mutated_genes] = log_add(gene[mutated_genes], log_p)
+
+        # Update probabilities for traits
+        trait = log_probabilities[person]["trait"]
+        known = people[person]["trait"]
+        if known is not None:
+            trait[known] = log_add(trait[known], log_p)
+        else:
+            for value in (True, False):
+                trait[value] = log_add(
+                    trait[value], log_p + log_trait[2 * mutated_genes + value]
+                )
+
+
+def log(p):
+    """
+    Return the natural logarithm of probability `p`, or -inf if `p` is 0.
+
+    Probabilities of large families are products of many small factors,
+    which underflow to 0 as floats, so they are computed as sums of
+    logarithms instead, using these helpers to stay in log space.
+    """
+    return math.log(p) if p > 0 else -math.inf
+
+
+def log_add(a, b):
+    """
+    Return log(exp(a) + exp(b)) without leaving log space.
+    """
+    if a < b:
+        a, b = b, a
+    if b == -math.inf:
+        return a
+    return a + math.log1p(math.exp(b - a))
+
+
 def update(probabilities, one_gene, two_genes, have_trait, p):
     """
     Add to `probabilities` a new joint probability `p`.
@@ -228,5 +476,27 @@ def normalize(probabilities):
             trait[e] *= trait_factor
 
 
+def log_normalize(log_probabilities):
+    """
+    Update `log_probabilities`, which holds logarithms of probabilities,
+    such that each distribution holds the normalized probabilities
+    (i.e., summing to 1, with relative proportions the same).
+    The largest logarithm is subtracted before exponentiating, so
+    distributions with tiny probabilities don't become 0 / 0.
+    A distribution with no possible value raises ZeroDivisionError, as
+    normalizing it in linear space would.
+    """
+    for person in log_probabilities:
+        for distribution in log_probabilities[person].values():
+            largest = max(distribution.values())
+            if largest == -math.inf:
+                raise ZeroDivisionError(f"{person} has no possible value")
+            for e in distribution:
+                distribution[e] = math.exp(distribution[e] - largest)
+            total = sum(distribution.values())
+            for e in distribution:
+                distribution[e] /= total
+
+
 if __name__ == "__main__":
     main()
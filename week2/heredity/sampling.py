@@ -0,0 +1,280 @@
+import sys
+
+import numpy as np
+
+from heredity import load_data
+from elimination import infer, trait_distribution
+from vectorized import CHUNK_SIZE, log_tables, tables
+
+# Ways of sampling
+METHODS = ["likelihood", "gibbs"]
+
+# Default number of samples drawn
+SAMPLES = 100000
+
+# Number of Gibbs chains run side by side, and fraction of sweeps discarded
+CHAINS = 32
+BURN_IN = 0.2
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python sampling.py data.csv [method] [samples]")
+    people = load_data(sys.argv[1])
+    method = sys.argv[2] if len(sys.argv) >= 3 else "likelihood"
+    if method not in METHODS:
+        sys.exit(f"Method must be one of: {', '.join(METHODS)}")
+    samples = int(sys.argv[3]) if len(sys.argv) == 4 else SAMPLES
+
+    if method == "likelihood":
+        probabilities, diagnostics = likelihood_weighting(people, samples)
+    else:
+        probabilities, diagnostics = gibbs_sampling(people, samples)
+
+    # Print results, diagnostics, and how far they are from exact inference
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+    for name, value in diagnostics.items():
+        print(f"{name.replace('_', ' ').capitalize()}: {value:.4f}")
+    print(f"Max absolute error: {max_error(probabilities, infer(people)):.4f}")
+
+
+def topological_order(people):
+    """
+    Return the people listed so that parents always come before their children.
+    """
+    order = []
+    placed = set()
+
+    def place(person):
+        stack = [person]
+        while stack:
+            current = stack[-1]
+            if current in placed:
+                stack.pop()
+                continue
+            parents = [
+                parent for parent in (people[current]["father"], people[current]["mother"])
+                if parent in people and parent not in placed
+            ]
+            if parents:
+                stack.extend(parents)
+            else:
+                stack.pop()
+                placed.add(current)
+                order.append(current)
+
+    for person in people:
+        place(person)
+    return order
+
+
+def draw(distributions, rng):
+    """
+    Draw one number of genes per row of `distributions`, an array whose
+    rows are (possibly unnormalized) distributions over 0, 1 and 2 genes.
+    """
+    cumulative = np.cumsum(distributions, axis=1)
+    u = rng.random(len(distributions)) * cumulative[:, -1]
+    return (u[:, None] >= cumulative[:, :-1]).sum(axis=1)
+
+
+def columns(people, names):
+    """
+    Return the column of each person's father and mother in an array of
+    gene counts with one column per name, plus a last column that is
+    always zero, used for parents missing from the data set.
+    """
+    column = {name: k for k, name in enumerate(names)}
+    fathers = [column.get(people[name]["father"], len(names)) for name in names]
+    mothers = [column.get(people[name]["mother"], len(names)) for name in names]
+    return fathers, mothers
+
+
+def summarize(people, names, totals):
+    """
+    Return the distributions of everyone given unnormalized gene counts,
+    one row per name, in the same format produced by `heredity.main`.
+    Unknown traits are computed from the gene distributions.
+    """
+    totals = totals / totals.sum(axis=1, keepdims=True)
+    probabilities = dict()
+    for k, name in enumerate(names):
+        gene = {g: float(totals[k, g]) for g in (2, 1, 0)}
+        probabilities[name] = {
+            "gene": gene,
+            "trait": trait_distribution(gene, people[name]["trait"]),
+        }
+    return probabilities
+
+
+def likelihood_weighting(people, samples=SAMPLES, seed=None):
+    """
+    Estimate everyone's distributions by sampling genes from the prior,
+    parents before children, and weighting each sample by the likelihood
+    of the observed traits. Samples are drawn in batches, as arrays.
+
+    Return the distributions and a dictionary with the effective sample
+    size, which is much smaller than `samples` when the evidence is unlikely.
+    Raise ValueError if every sample contradicts the observed traits.
+    """
+    rng = np.random.default_rng(seed)
+    names = topological_order(people)
+    n = len(names)
+    fathers, mothers = columns(people, names)
+    prior, inheritance, _ = tables()
+
+    # Weights are kept as logarithms, scaled by the largest one seen so far
+    log_trait = log_tables()[2]
+    totals = np.zeros((n, 3))
+    weight_sum = 0
+    square_sum = 0
+    shift = -np.inf
+    for start in range(0, samples, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, samples - start)
+        genes = np.zeros((size, n + 1), dtype=np.int64)
+        log_weights = np.zeros(size)
+        for k, name in enumerate(names):
+            if people[name]["father"] or people[name]["mother"]:
+                distributions = inheritance[:, genes[:, fathers[k]], genes[:, mothers[k]]].T
+            else:
+                distributions = np.broadcast_to(prior, (size, 3))
+            genes[:, k] = draw(distributions, rng)
+
+            # Observed traits are not sampled, only weighed
+            if people[name]["trait"] is not None:
+                log_weights += log_trait[genes[:, k], int(people[name]["trait"])]
+
+        # Skip chunks where every sample contradicts the evidence
+        if log_weights.max() == -np.inf:
+            continue
+        if log_weights.max() > shift:
+            scale = np.exp(shift - log_weights.max())
+            totals *= scale
+            weight_sum *= scale
+            square_sum *= scale ** 2
+            shift = log_weights.max()
+        weights = np.exp(log_weights - shift)
+
+        bins = genes[:, :n] + 3 * np.arange(n)
+        totals += np.bincount(
+            bins.ravel(), weights=np.repeat(weights, n), minlength=3 * n
+        ).reshape(n, 3)
+        weight_sum += weights.sum()
+        square_sum += (weights ** 2).sum()
+
+    if weight_sum == 0:
+        raise ValueError("every sample contradicts the observed traits")
+    diagnostics = {"effective_sample_size": float(weight_sum ** 2 / square_sum)}
+    return summarize(people, names, totals), diagnostics
+
+
+def gibbs_sampling(people, samples=SAMPLES, chains=CHAINS, seed=None):
+    """
+    Estimate everyone's distributions by Gibbs sampling: starting from a
+    sample of the prior, repeatedly resample each person's genes given
+    their parents', their children's and their co-parents' genes, and
+    their observed trait. `chains` independent chains are updated at
+    once, for `samples // chains` sweeps, the first of which are discarded.
+
+    Return the distributions and a dictionary with the largest potential
+    scale reduction factor (R-hat) over every person and number of genes,
+    which approaches 1 as the chains agree.
+    """
+    rng = np.random.default_rng(seed)
+    names = topological_order(people)
+    n = len(names)
+    fathers, mothers = columns(people, names)
+    prior, inheritance, trait = tables()
+    sweeps = max(samples // chains, 2)
+    burn_in = int(sweeps * BURN_IN)
+
+    # Children of each person, with the column of their other parent
+    children = [[] for _ in names]
+    for k, name in enumerate(names):
+        if fathers[k] < n:
+            children[fathers[k]].append((k, "father", mothers[k]))
+        if mothers[k] < n:
+            children[mothers[k]].append((k, "mother", fathers[k]))
+
+    # Start every chain from a sample of the prior
+    genes = np.zeros((chains, n + 1), dtype=np.int64)
+    for k, name in enumerate(names):
+        if people[name]["father"] or people[name]["mother"]:
+            distributions = inheritance[:, genes[:, fathers[k]], genes[:, mothers[k]]].T
+        else:
+            distributions = np.broadcast_to(prior, (chains, 3))
+        genes[:, k] = draw(distributions, rng)
+
+    # Count, per chain, how often each person has each number of genes
+    counts = np.zeros((chains, n, 3))
+    candidates = np.arange(3)
+    bins = 3 * np.arange(n) + 3 * n * np.arange(chains)[:, None]
+    for sweep in range(sweeps):
+        for k, name in enumerate(names):
+
+            # Probability of each number of genes given the rest of the sample
+            if people[name]["father"] or people[name]["mother"]:
+                conditional = inheritance[:, genes[:, fathers[k]], genes[:, mothers[k]]].T
+            else:
+                conditional = np.tile(prior, (chains, 1))
+            for child, role, other in children[k]:
+                own = genes[:, child][:, None]
+                partner = genes[:, other][:, None]
+                if role == "father":
+                    conditional = conditional * inheritance[own, candidates, partner]
+                else:
+                    conditional = conditional * inheritance[own, partner, candidates]
+            if people[name]["trait"] is not None:
+                conditional = conditional * trait[:, int(people[name]["trait"])]
+            genes[:, k] = draw(conditional, rng)
+
+        if sweep >= burn_in:
+            counts += np.bincount(
+                (genes[:, :n] + bins).ravel(), minlength=chains * 3 * n
+            ).reshape(chains, n, 3)
+
+    diagnostics = {"r_hat": r_hat(counts / (sweeps - burn_in), sweeps - burn_in)}
+    return summarize(people, names, counts.sum(axis=0)), diagnostics
+
+
+def r_hat(means, length):
+    """
+    Return the largest Gelman-Rubin potential scale reduction factor,
+    given the mean of each indicator (a person having a number of genes)
+    in each chain, over chains of `length` samples. Indicators that never
+    vary within a chain are ignored.
+    """
+    chains = len(means)
+    if chains < 2 or length < 2:
+        return float("nan")
+    within = (means * (1 - means) * length / (length - 1)).mean(axis=0)
+    between = length * means.var(axis=0, ddof=1)
+    varying = within > 0
+    if not varying.any():
+        return 1.0
+    pooled = (length - 1) / length * within[varying] + between[varying] / length
+    return float(np.sqrt(pooled / within[varying]).max())
+
+
+def max_error(estimate, exact):
+    """
+    Return the largest absolute difference between two sets of distributions.
+    """
+    return max(
+        abs(estimate[person][field][value] - exact[person][field][value])
+        for person in exact
+        for field in exact[person]
+        for value in exact[person][field]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import numpy as np
+
+from heredity import probability_tables
+
+# Number of joint assignments evaluated at once
+CHUNK_SIZE = 2 ** 16
+
+
+def tables():
+    """
+    Return the probability tables as arrays: the unconditional gene
+    distribution indexed by genes, the child gene distribution indexed
+    by (child, father, mother) genes, and the trait likelihood indexed
+    by (genes, trait).
+    """
+    cached = probability_tables()
+    prior = np.array(cached["gene"])
+    inheritance = np.array(cached["inheritance"]).reshape(3, 3, 3)
+    trait = np.array(cached["trait"]).reshape(3, 2)
+    return prior, inheritance, trait
+
+
+def log_tables():
+    """
+    Return the logarithms of the arrays returned by `tables`, read from
+    the cached log tables, with impossible events at -inf.
+    """
+    cached = probability_tables()
+    log_prior = np.array(cached["log_gene"])
+    log_inheritance = np.array(cached["log_inheritance"]).reshape(3, 3, 3)
+    log_trait = np.array(cached["log_trait"]).reshape(3, 2)
+    return log_prior, log_inheritance, log_trait
+
+
+def vectorized_probabilities(people, chunk_size=CHUNK_SIZE):
+    """
+    Return, for everyone in `people`, the distributions over their number
+    of genes and over having the trait, by exact enumeration like
+    `heredity.enumerate_probabilities`, but evaluating whole batches of
+    joint assignments with array operations.
+
+    Each joint assignment is a row of gene counts, one column per person.
+    """
+    names = list(people)
+    column = {name: k for k, name in enumerate(names)}
+    n = len(names)
+    prior, inheritance, trait = tables()
+
+    # Parents' columns, with missing parents pointing at an all-zero column
+    founders = [k for k, name in enumerate(names)
+                if not (people[name]["father"] or people[name]["mother"])]
+    children = [k for k in range(n) if k not in founders]
+    fathers = [column.get(people[names[k]]["father"], n) for k in children]
+    mothers = [column.get(people[names[k]]["mother"], n) for k in children]
+    observed = [k for k, name in enumerate(names) if people[name]["trait"] is not None]
+    traits = [int(people[names[k]]["trait"]) for k in observed]
+
+    # Work with logarithms, scaling every chunk by the largest log probability
+    # seen so far
+    log_prior, log_inheritance, log_trait = log_tables()
+    totals = np.zeros((n, 3))
+    shift = -np.inf
+    powers = 3 ** np.arange(n)
+    for start in range(0, 3 ** n, chunk_size):
+
+        # Decode a batch of assignment indices into base-3 gene counts
+        indices = np.arange(start, min(start + chunk_size, 3 ** n))
+        genes = np.zeros((len(indices), n + 1), dtype=np.int64)
+        genes[:, :n] = indices[:, None] // powers % 3
+
+        # Multiply every factor of every assignment at once, as a sum of logs
+        log_p = log_prior[genes[:, founders]].sum(axis=1)
+        log_p += log_inheritance[
+            genes[:, children], genes[:, fathers], genes[:, mothers]
+        ].sum(axis=1)
+        log_p += log_trait[genes[:, observed], traits].sum(axis=1)
+
+        # Skip chunks of impossible assignments
+        if log_p.max() == -np.inf:
+            continue
+        if log_p.max() > shift:
+            totals *= np.exp(shift - log_p.max())
+            shift = log_p.max()
+        p = np.exp(log_p - shift)
+
+        # Accumulate gene marginals of everyone in a single bincount
+        bins = genes[:, :n] + 3 * np.arange(n)
+        totals += np.bincount(
+            bins.ravel(), weights=np.repeat(p, n), minlength=3 * n
+        ).reshape(n, 3)
+
+    totals /= totals.sum(axis=1, keepdims=True)
+
+    probabilities = dict()
+    for k, name in enumerate(names):
+        gene = {g: float(totals[k, g]) for g in (2, 1, 0)}
+        known = people[name]["trait"]
+        if known is not None:
+            has_trait = float(known)
+        else:
+            has_trait = float(totals[k] @ trait[:, 1])
+        probabilities[name] = {
+            "gene": gene,
+            "trait": {True: has_trait, False: 1 - has_trait},
+        }
+    return probabilities